@@ -5,24 +5,669 @@ Módulo de Análise de Grafos para Trabalho de Teoria dos Grafos
 import os
 import sys
 import math
-from collections import defaultdict, deque
+import heapq
+import random
+import time
+import argparse
+import contextlib
+import cProfile
+import pstats
+import tracemalloc
+from array import array
+from collections import Counter, defaultdict, deque, namedtuple
+from collections.abc import Mapping
+from concurrent.futures import ProcessPoolExecutor, as_completed
 import json
+import gzip
+import lzma
+import bz2
+import mmap
+import struct
+import hashlib
+import shutil
+import glob
+import csv
 
-class MultigrafoOrientado:
+try:
+    import numpy as np
+except ImportError:  # numpy é opcional: sem ele os algoritmos usam apenas a biblioteca padrão
+    np = None
+
+# Estratégias de escolha das origens na estimativa da intermediação por amostragem
+ESTRATEGIAS_AMOSTRAGEM = ("uniforme", "grau")
+
+# Motores disponíveis para o cálculo de caminhos mínimos
+MOTORES_CAMINHOS = ("auto", "python", "numpy", "dijkstra")
+
+# No modo "auto", usa Dijkstra a partir de cada origem quando m·log2(n) < FATOR_ESPARSIDADE·n²
+# (m = pares de nós ligados diretamente), ou seja, quando o grafo é esparso
+FATOR_ESPARSIDADE = 0.5
+
+# Campos de calcular_estatisticas, na ordem em que são exportados
+METRICAS_ESTATISTICAS = (
+    "num_nos", "num_arestas", "num_arcos", "num_nos_requeridos", "num_arestas_requeridas",
+    "num_arcos_requeridos", "densidade", "componentes_conectados", "componentes_fortemente_conectados",
+    "grau_minimo", "grau_maximo", "centralidade_intermediacao", "intermediacao_aproximada",
+    "comprimento_medio_caminho", "diametro", "raio", "excentricidade", "excentricidade_deposito",
+    "centralidade_proximidade", "nome", "deposito", "veiculos", "capacidade", "valor_otimo",
+)
+
+# Campos de calcular_estatisticas que dependem da matriz de caminhos mínimos
+METRICAS_CAMINHOS = ("comprimento_medio_caminho", "diametro", "raio", "excentricidade", "excentricidade_deposito",
+                     "centralidade_proximidade")
+
+# Linhas da matriz de distâncias processadas por vez nas métricas vetorizadas (limita as matrizes temporárias)
+LINHAS_POR_BLOCO_METRICAS = 1024
+
+# Variável de ambiente com o caminho do relatório de instrumentação (equivale a --instrumentacao)
+VARIAVEL_INSTRUMENTACAO = "ANALISE_GRAFOS_INSTRUMENTACAO"
+
+# Número de funções do perfil (cProfile) e de linhas de alocação (tracemalloc) no relatório
+LIMITE_RELATORIO_INSTRUMENTACAO = 30
+
+class Instrumentacao:
+    """
+    Registro dos intervalos de tempo das etapas da análise, com captura opcional do perfil de
+    execução (cProfile) e das alocações de memória (tracemalloc).
+    
+    Os intervalos são abertos com medir(nome, **atributos) e podem ser aninhados; cada um
+    guarda o início relativo, a duração, a profundidade e, com memoria=True, a memória alocada
+    durante o intervalo e o pico até o seu fim. relatorio() devolve tudo em um dicionário
+    serializável em JSON.
+    """
+    def __init__(self, perfil=False, memoria=False):
+        self.intervalos = []
+        self._abertos = []
+        self._data = time.strftime("%Y-%m-%dT%H:%M:%S")
+        self._inicio = time.perf_counter()
+        self._duracao = None
+        self.perfil = cProfile.Profile() if perfil else None
+        self.memoria = memoria
+        self._alocacoes = None
+        # Indica se o tracemalloc foi ligado aqui (e não por quem chamou), para desligá-lo em parar
+        self._iniciou_tracemalloc = False
+
+    def iniciar(self):
+        """Inicia a captura do perfil e das alocações, se pedidas."""
+        if self.memoria and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._iniciou_tracemalloc = True
+        if self.perfil is not None:
+            self.perfil.enable()
+
+    def parar(self):
+        """Encerra as capturas, guardando as linhas que mais alocaram memória."""
+        if self.perfil is not None:
+            self.perfil.disable()
+        if self.memoria and tracemalloc.is_tracing():
+            estatisticas = tracemalloc.take_snapshot().statistics("lineno")
+            self._alocacoes = [{"local": str(estatistica.traceback), "bytes": estatistica.size,
+                                "blocos": estatistica.count}
+                               for estatistica in estatisticas[:LIMITE_RELATORIO_INSTRUMENTACAO]]
+            self._pico_memoria = tracemalloc.get_traced_memory()[1]
+            if self._iniciou_tracemalloc:
+                tracemalloc.stop()
+                self._iniciou_tracemalloc = False
+        self._duracao = time.perf_counter() - self._inicio
+
+    @contextlib.contextmanager
+    def medir(self, nome, **atributos):
+        """Registra a duração (e a memória, se capturada) do bloco with como um intervalo."""
+        intervalo = {"nome": nome, "inicio_segundos": time.perf_counter() - self._inicio,
+                     "profundidade": len(self._abertos)}
+        if atributos:
+            intervalo["atributos"] = atributos
+        self.intervalos.append(intervalo)
+        self._abertos.append(intervalo)
+        memoria_inicial = tracemalloc.get_traced_memory()[0] if self.memoria else 0
+        inicio = time.perf_counter()
+        try:
+            yield intervalo
+        finally:
+            intervalo["duracao_segundos"] = time.perf_counter() - inicio
+            if self.memoria:
+                atual, pico = tracemalloc.get_traced_memory()
+                intervalo["memoria_alocada_bytes"] = atual - memoria_inicial
+                intervalo["memoria_pico_bytes"] = pico
+            self._abertos.pop()
+
+    def relatorio(self):
+        """Retorna os intervalos, o total por nome de etapa e, se capturados, o perfil e as alocações."""
+        resumo = {}
+        for intervalo in self.intervalos:
+            total = resumo.setdefault(intervalo["nome"], {"chamadas": 0, "tempo_total_segundos": 0.0})
+            total["chamadas"] += 1
+            total["tempo_total_segundos"] += intervalo.get("duracao_segundos", 0.0)
+        
+        relatorio = {
+            "data": self._data,
+            "duracao_total_segundos": self._duracao if self._duracao is not None else time.perf_counter() - self._inicio,
+            "intervalos": self.intervalos,
+            "resumo": resumo,
+        }
+        if self.perfil is not None:
+            estatisticas = pstats.Stats(self.perfil).stats
+            funcoes = sorted(estatisticas.items(), key=lambda item: item[1][3], reverse=True)
+            relatorio["perfil"] = [
+                {"funcao": f"{arquivo}:{linha}({nome})", "chamadas": chamadas,
+                 "tempo_proprio_segundos": tempo_proprio, "tempo_acumulado_segundos": tempo_acumulado}
+                for (arquivo, linha, nome), (_, chamadas, tempo_proprio, tempo_acumulado, _)
+                in funcoes[:LIMITE_RELATORIO_INSTRUMENTACAO]
+            ]
+        if self._alocacoes is not None:
+            relatorio["memoria"] = {"pico_bytes": self._pico_memoria, "maiores_alocacoes": self._alocacoes}
+        return relatorio
+
+    def gravar(self, arquivo_saida):
+        """Grava o relatório em JSON; com perfil, grava também <arquivo>.prof (formato do pstats)."""
+        with open(arquivo_saida, 'w') as arquivo:
+            json.dump(self.relatorio(), arquivo, indent=2)
+        if self.perfil is not None:
+            self.perfil.dump_stats(arquivo_saida + ".prof")
+
+# Instrumentação ativa (None quando desativada) e contexto vazio usado por medir sem ela
+_instrumentacao_ativa = None
+_SEM_INSTRUMENTACAO = contextlib.nullcontext()
+
+def ativar_instrumentacao(perfil=False, memoria=False):
+    """Ativa a medição dos intervalos abertos com medir e retorna a Instrumentacao criada."""
+    global _instrumentacao_ativa
+    _instrumentacao_ativa = Instrumentacao(perfil, memoria)
+    _instrumentacao_ativa.iniciar()
+    return _instrumentacao_ativa
+
+def desativar_instrumentacao():
+    """Desativa a instrumentação e retorna a Instrumentacao que estava ativa (ou None)."""
+    global _instrumentacao_ativa
+    instrumentacao, _instrumentacao_ativa = _instrumentacao_ativa, None
+    if instrumentacao is not None:
+        instrumentacao.parar()
+    return instrumentacao
+
+def medir(nome, **atributos):
+    """
+    Gerenciador de contexto que registra o bloco como um intervalo da instrumentação ativa.
+    Sem instrumentação ativa, não faz nada.
+    """
+    if _instrumentacao_ativa is None:
+        return _SEM_INSTRUMENTACAO
+    return _instrumentacao_ativa.medir(nome, **atributos)
+
+class AlgoritmosGrafo:
+    """
+    Algoritmos de caminhos mínimos, componentes conectados e centralidade comuns às
+    representações de grafo deste módulo.
+    
+    As classes que herdam daqui fornecem o conjunto nos, obter_vizinhos, obter_grau,
+    obter_adjacencia_indexada, obter_adjacencia_multiplicidade, obter_nos_servico, o atributo
+    deposito e os atributos de cache _cache_caminhos e _cache_matrizes_numpy.
+    """
+    # Sem atributos próprios: permite que GrafoCSR dispense o __dict__ por instância
+    __slots__ = ()
+
+    def calcular_caminhos_minimos(self, motor="auto", fontes=None, processos=1, contrair=False):
+        """
+        Calcula os caminhos mínimos entre todos os pares de nós com o motor escolhido.
+        Retorna a matriz de distâncias e a matriz de predecessores.
+        
+        O parâmetro motor escolhe a implementação: "python" (laços em Python puro), "numpy"
+        (atualização vetorizada por k), "dijkstra" (Dijkstra com heap a partir de cada origem,
+        indicado para grafos esparsos) ou "auto" (Dijkstra em grafos esparsos; caso contrário,
+        numpy quando disponível).
+        
+        Se fontes for informado, calcula apenas as linhas dessas origens com Dijkstra: dist[i] e
+        pred[i] correspondem a fontes[i], e as colunas seguem lista_nos.
+        
+        Com processos > 1, as execuções de Dijkstra de cada origem são distribuídas entre
+        processos (o modo "auto" passa a usar Dijkstra nesse caso).
+        
+        Com contrair=True, o cálculo é feito sobre o grafo contraído (ver GrafoContraido), com o
+        motor escolhido, e as matrizes são expandidas de volta para todos os nós.
+        
+        O resultado completo é guardado e reaproveitado até a próxima alteração do grafo; as
+        matrizes retornadas são compartilhadas entre os chamadores e não devem ser modificadas
+        (as alterações incrementais do MultigrafoOrientado as atualizam no local).
+        """
+        if fontes is not None:
+            return self._calcular_caminhos_fontes(fontes, processos)
+        
+        if self._cache_caminhos is None and contrair:
+            self._cache_caminhos = GrafoContraido(self).calcular_caminhos_minimos(motor, processos)
+        if self._cache_caminhos is None:
+            if motor == "auto" and processos > 1:
+                motor = "dijkstra"
+            motor = resolver_motor_caminhos(motor, len(self.nos), self.contar_pares_adjacentes())
+            with medir("calcular_caminhos_minimos", motor=motor, num_nos=len(self.nos), processos=processos):
+                if motor == "numpy":
+                    dist, pred, lista_nos = self.calcular_matrizes_numpy()
+                    with medir("matrizes_numpy_para_listas"):
+                        dist, pred = matrizes_numpy_para_listas(dist, pred)
+                    self._cache_caminhos = (dist, pred, lista_nos)
+                elif motor == "dijkstra":
+                    lista_nos = sorted(list(self.nos))
+                    with medir("obter_adjacencia_indexada"):
+                        adjacencia = self.obter_adjacencia_indexada(lista_nos)
+                    dist, pred = calcular_linhas_dijkstra(adjacencia, range(len(lista_nos)), processos)
+                    self._cache_caminhos = (dist, pred, lista_nos)
+                else:
+                    self._cache_caminhos = self._floyd_warshall()
+        return self._cache_caminhos
+
+    def _calcular_caminhos_fontes(self, fontes, processos=1):
+        """Calcula (ou recorta do resultado já guardado) as linhas de caminhos mínimos das origens dadas."""
+        lista_nos = sorted(list(self.nos))
+        no_para_indice = {no: i for i, no in enumerate(lista_nos)}
+        for fonte in fontes:
+            if fonte not in no_para_indice:
+                raise KeyError(f"Nó de origem inexistente no grafo: {fonte!r}")
+        
+        if self._cache_caminhos is not None:
+            dist, pred, _ = self._cache_caminhos
+            indices = [no_para_indice[fonte] for fonte in fontes]
+            return [dist[i] for i in indices], [pred[i] for i in indices], lista_nos
+        
+        with medir("calcular_caminhos_fontes", num_fontes=len(fontes), processos=processos):
+            adjacencia = self.obter_adjacencia_indexada(lista_nos)
+            origens = [no_para_indice[fonte] for fonte in fontes]
+            dist, pred = calcular_linhas_dijkstra(adjacencia, origens, processos)
+        return dist, pred, lista_nos
+
+    def contar_pares_adjacentes(self):
+        """Conta os pares ordenados (u, v) ligados diretamente por uma aresta ou um arco."""
+        return sum(len(self.obter_vizinhos(no)) for no in self.nos)
+
+    def calcular_matrizes_numpy(self):
+        """
+        Retorna as matrizes de distâncias (float64, inf sem caminho) e de predecessores
+        (int64, -1 sem predecessor) como arrays numpy, junto com a lista de nós.
+        """
+        if np is None:
+            raise RuntimeError("O motor 'numpy' requer a biblioteca numpy instalada.")
+        
+        if self._cache_matrizes_numpy is None:
+            if self._cache_caminhos is not None:
+                dist, pred, lista_nos = self._cache_caminhos
+                dist, pred = listas_para_matrizes_numpy(dist, pred)
+                self._cache_matrizes_numpy = (dist, pred, lista_nos)
+            else:
+                self._cache_matrizes_numpy = self._floyd_warshall_numpy()
+        return self._cache_matrizes_numpy
+
+    def _floyd_warshall_numpy(self):
+        """Executa o algoritmo de Floyd-Warshall com uma atualização vetorizada por nó intermediário."""
+        lista_nos = sorted(list(self.nos))
+        n = len(lista_nos)
+        
+        # Inicializa matrizes de distância e predecessores
+        dist = np.full((n, n), np.inf)
+        pred = np.full((n, n), -1, dtype=np.int64)
+        np.fill_diagonal(dist, 0)
+        
+        # Inicializa com conexões diretas
+        for i, vizinhos in enumerate(self.obter_adjacencia_indexada(lista_nos)):
+            for j, custo in vizinhos:
+                if custo < dist[i, j]:
+                    dist[i, j] = custo
+                    pred[i, j] = i
+        
+        # Para cada k, relaxa todos os pares (i, j) de uma vez: dist[i][k] + dist[k][j]
+        for k in range(n):
+            via_k = dist[:, k, np.newaxis] + dist[np.newaxis, k, :]
+            melhora = via_k < dist
+            np.copyto(dist, via_k, where=melhora)
+            np.copyto(pred, np.broadcast_to(pred[k].copy(), (n, n)), where=melhora)
+        
+        return dist, pred, lista_nos
+
+    def _floyd_warshall(self):
+        """Executa o algoritmo de Floyd-Warshall sobre o estado atual do grafo."""
+        lista_nos = sorted(list(self.nos))
+        n = len(lista_nos)
+        
+        # Inicializa matrizes de distância e predecessores
+        dist = [[float('inf') for _ in range(n)] for _ in range(n)]
+        pred = [[-1 for _ in range(n)] for _ in range(n)]
+        
+        # Define a diagonal como 0
+        for i in range(n):
+            dist[i][i] = 0
+        
+        # Inicializa com conexões diretas
+        for i, vizinhos in enumerate(self.obter_adjacencia_indexada(lista_nos)):
+            for j, custo in vizinhos:
+                if custo < dist[i][j]:
+                    dist[i][j] = custo
+                    pred[i][j] = i
+        
+        # Algoritmo de Floyd-Warshall. A linha k não muda durante a iteração k (dist[k][k] = 0),
+        # então suas colunas alcançáveis são listadas uma vez; linhas i que não alcançam k são puladas
+        infinito = math.inf
+        for k in range(n):
+            dist_k, pred_k = dist[k], pred[k]
+            alcancaveis_k = [(j, d) for j, d in enumerate(dist_k) if d != infinito]
+            for i, dist_i in enumerate(dist):
+                dist_ik = dist_i[k]
+                if dist_ik == infinito or i == k:
+                    continue
+                pred_i = pred[i]
+                for j, dist_kj in alcancaveis_k:
+                    via_k = dist_ik + dist_kj
+                    if via_k < dist_i[j]:
+                        dist_i[j] = via_k
+                        pred_i[j] = pred_k[j]
+        
+        return dist, pred, lista_nos
+
+    def calcular_componentes_conectados(self):
+        """Calcula o número de componentes (fracamente) conectados no grafo."""
+        return len(self.calcular_componentes_fracos())
+
+    def calcular_componentes_fracos(self):
+        """
+        Calcula os componentes fracamente conectados: os nós ligados quando arestas e arcos são
+        percorridos em qualquer sentido. Usa união-busca iterativa, em O(V + E).
+        
+        Retorna a lista de componentes, cada um como lista de nós em ordem crescente, ordenada
+        pelo menor nó de cada componente.
+        """
+        lista_nos = sorted(list(self.nos))
+        no_para_indice = {no: i for i, no in enumerate(lista_nos)}
+        pai = list(range(len(lista_nos)))
+        
+        def raiz(i):
+            while pai[i] != i:
+                pai[i] = pai[pai[i]]
+                i = pai[i]
+            return i
+        
+        for i, no in enumerate(lista_nos):
+            for vizinho in self.obter_vizinhos(no):
+                a, b = raiz(i), raiz(no_para_indice[vizinho])
+                if a != b:
+                    # A raiz de cada conjunto é sempre o seu menor índice
+                    pai[max(a, b)] = min(a, b)
+        
+        componentes = {}
+        for i, no in enumerate(lista_nos):
+            componentes.setdefault(raiz(i), []).append(no)
+        return list(componentes.values())
+
+    def calcular_componentes_fortes(self):
+        """
+        Calcula os componentes fortemente conectados do grafo misto (arestas valem nos dois
+        sentidos, arcos apenas no seu) com o algoritmo de Tarjan em versão iterativa, em O(V + E)
+        e sem limite de profundidade de recursão.
+        
+        Retorna a lista de componentes, cada um como lista de nós em ordem crescente. Os
+        componentes saem em ordem topológica inversa do grafo condensado: nenhuma ligação sai de
+        um componente para outro que apareça depois dele na lista.
+        """
+        lista_nos = sorted(list(self.nos))
+        no_para_indice = {no: i for i, no in enumerate(lista_nos)}
+        adjacencia = [[no_para_indice[vizinho] for vizinho in self.obter_vizinhos(no)] for no in lista_nos]
+        n = len(lista_nos)
+        
+        ordem = [-1] * n      # ordem de descoberta
+        menor = [0] * n       # menor ordem alcançável pela subárvore
+        na_pilha = [False] * n
+        pilha = []
+        componentes = []
+        contador = 0
+        
+        for inicio in range(n):
+            if ordem[inicio] != -1:
+                continue
+            ordem[inicio] = menor[inicio] = contador
+            contador += 1
+            pilha.append(inicio)
+            na_pilha[inicio] = True
+            chamadas = [(inicio, 0)]  # pilha explícita de (nó, próximo vizinho a visitar)
+            
+            while chamadas:
+                v, k = chamadas[-1]
+                if k < len(adjacencia[v]):
+                    chamadas[-1] = (v, k + 1)
+                    w = adjacencia[v][k]
+                    if ordem[w] == -1:
+                        ordem[w] = menor[w] = contador
+                        contador += 1
+                        pilha.append(w)
+                        na_pilha[w] = True
+                        chamadas.append((w, 0))
+                    elif na_pilha[w] and ordem[w] < menor[v]:
+                        menor[v] = ordem[w]
+                    continue
+                
+                chamadas.pop()
+                if chamadas:
+                    u = chamadas[-1][0]
+                    if menor[v] < menor[u]:
+                        menor[u] = menor[v]
+                if menor[v] == ordem[v]:
+                    componente = []
+                    while True:
+                        w = pilha.pop()
+                        na_pilha[w] = False
+                        componente.append(lista_nos[w])
+                        if w == v:
+                            break
+                    componentes.append(sorted(componente))
+        
+        return componentes
+
+    def calcular_centralidade_intermediacao(self, normalizado=False, amostras=None, estrategia="uniforme",
+                                            semente=0, tempo_limite=None):
+        """
+        Calcula a centralidade de intermediação para todos os nós com o algoritmo de Brandes:
+        um Dijkstra ponderado por origem seguido da acumulação de dependências. Pares com vários
+        caminhos mínimos (inclusive por ligações paralelas de mesmo custo) dividem a contribuição.
+        
+        Com normalizado=True, os valores são divididos por (n - 1)(n - 2), o número de pares
+        ordenados que podem ter cada nó como intermediário.
+        
+        Se amostras ou tempo_limite for informado, retorna a estimativa por amostragem de origens
+        (ver estimar_centralidade_intermediacao) em vez do valor exato.
+        """
+        if amostras is not None or tempo_limite is not None:
+            return self.estimar_centralidade_intermediacao(amostras, estrategia, semente, tempo_limite,
+                                                           normalizado=normalizado)["valores"]
+        
+        lista_nos = sorted(list(self.nos))
+        n = len(lista_nos)
+        adjacencia = self.obter_adjacencia_multiplicidade(lista_nos)
+        
+        valores = [0.0] * n
+        with medir("dependencias_brandes", origens=n):
+            for origem in range(n):
+                for i, dependencia in enumerate(dependencias_brandes(adjacencia, origem)):
+                    valores[i] += dependencia
+        
+        if normalizado and n > 2:
+            escala = 1 / ((n - 1) * (n - 2))
+            valores = [valor * escala for valor in valores]
+        
+        return {no: valores[i] for i, no in enumerate(lista_nos)}
+
+    def estimar_centralidade_intermediacao(self, amostras=None, estrategia="uniforme", semente=0,
+                                           tempo_limite=None, confianca=0.95, normalizado=False):
+        """
+        Estima a centralidade de intermediação executando a etapa de Brandes apenas para origens
+        sorteadas (com reposição), de forma uniforme ou proporcional ao grau (estrategia="grau").
+        Cada origem s, sorteada com probabilidade p_s, contribui com dependencia_s / p_s, o que
+        torna a média das amostras um estimador não enviesado do valor exato.
+        
+        Sorteia `amostras` origens ou, com tempo_limite (em segundos), continua sorteando até o
+        prazo (limitado por `amostras`, se também informado). O gerador usa a semente dada.
+        
+        Retorna um dicionário com "valores" ({no: estimativa}), "amostras", "estrategia",
+        "confianca" e "erro_maximo": pela desigualdade de Hoeffding com correção de Bonferroni,
+        com probabilidade de pelo menos `confianca` todas as estimativas estão a no máximo
+        erro_maximo do valor exato.
+        """
+        if amostras is None and tempo_limite is None:
+            raise ValueError("Informe o número de amostras e/ou o tempo limite da estimativa.")
+        if amostras is not None and amostras < 1:
+            raise ValueError(f"O número de amostras deve ser ao menos 1: {amostras}")
+        if tempo_limite is not None and tempo_limite <= 0:
+            raise ValueError(f"O tempo limite deve ser positivo: {tempo_limite}")
+        if not 0 < confianca < 1:
+            raise ValueError(f"A confiança deve estar entre 0 e 1 (exclusive): {confianca}")
+        if estrategia not in ESTRATEGIAS_AMOSTRAGEM:
+            raise ValueError(f"Estratégia de amostragem desconhecida: {estrategia!r}")
+        
+        lista_nos = sorted(list(self.nos))
+        n = len(lista_nos)
+        if n == 0:
+            return {"valores": {}, "amostras": 0, "estrategia": estrategia, "confianca": confianca, "erro_maximo": 0.0}
+        adjacencia = self.obter_adjacencia_multiplicidade(lista_nos)
+        
+        # Probabilidade de sorteio de cada origem (o grau + 1 evita probabilidade zero)
+        if estrategia == "grau":
+            pesos = [self.obter_grau(no) + 1 for no in lista_nos]
+        else:
+            pesos = [1] * n
+        total_pesos = sum(pesos)
+        probabilidades = [peso / total_pesos for peso in pesos]
+        pesos_acumulados = []
+        acumulado = 0
+        for peso in pesos:
+            acumulado += peso
+            pesos_acumulados.append(acumulado)
+        
+        gerador = random.Random(semente)
+        prazo = time.perf_counter() + tempo_limite if tempo_limite is not None else None
+        somas = [0.0] * n
+        sorteadas = 0
+        with medir("dependencias_brandes", estrategia=estrategia):
+            while amostras is None or sorteadas < amostras:
+                if prazo is not None and sorteadas > 0 and time.perf_counter() >= prazo:
+                    break
+                origem = gerador.choices(range(n), cum_weights=pesos_acumulados)[0]
+                fator = 1 / probabilidades[origem]
+                for i, dependencia in enumerate(dependencias_brandes(adjacencia, origem)):
+                    if dependencia:
+                        somas[i] += dependencia * fator
+                sorteadas += 1
+        
+        # Cada termo fica em [0, (n - 2) / p_min]; Hoeffding + união sobre os n nós
+        amplitude = max(n - 2, 0) / min(probabilidades)
+        erro_maximo = amplitude * math.sqrt(math.log(2 * n / (1 - confianca)) / (2 * sorteadas))
+        
+        escala = 1 / sorteadas
+        if normalizado and n > 2:
+            escala /= (n - 1) * (n - 2)
+            erro_maximo /= (n - 1) * (n - 2)
+        
+        return {
+            "valores": {no: somas[i] * escala for i, no in enumerate(lista_nos)},
+            "amostras": sorteadas,
+            "estrategia": estrategia,
+            "confianca": confianca,
+            "erro_maximo": erro_maximo,
+        }
+
+    def calcular_comprimento_medio_caminho(self):
+        """Calcula o comprimento médio do caminho no grafo."""
+        return self.calcular_metricas_caminhos()["comprimento_medio_caminho"]
+
+    def calcular_diametro(self):
+        """Calcula o diâmetro do grafo (caminho mínimo mais longo)."""
+        return self.calcular_metricas_caminhos()["diametro"]
+
+    def calcular_metricas_caminhos(self):
+        """
+        Calcula, em uma única varredura da matriz de distâncias, as métricas que dependem dos
+        caminhos mínimos. Só os pares (i, j) com i != j e caminho de i para j são considerados:
+        
+        - comprimento_medio_caminho: média das distâncias desses pares (0 se não houver nenhum);
+        - excentricidade: {no: maior distância a partir do nó até um nó alcançável};
+        - diametro e raio: maior e menor excentricidade (o raio ignora nós que não alcançam
+          nenhum outro); 0 se não houver pares;
+        - excentricidade_deposito: excentricidade do depósito (None se ele não estiver no grafo);
+        - centralidade_proximidade: {no: proximidade pelas distâncias de saída}, com a correção
+          de Wasserman-Faust para grafos desconexos: (r / (n - 1)) · (r / soma), sendo r o
+          número de nós alcançados e soma a soma das distâncias até eles.
+        
+        Quando as matrizes numpy já estão calculadas (motor "numpy"), a varredura é vetorizada
+        por blocos de linhas; caso contrário, cada linha da matriz em listas é percorrida uma vez.
+        """
+        if np is not None and self._cache_matrizes_numpy is not None:
+            dist, _, lista_nos = self._cache_matrizes_numpy
+            alcancados, somas, excentricidades = [], [], []
+            for inicio in range(0, len(lista_nos), LINHAS_POR_BLOCO_METRICAS):
+                bloco = dist[inicio:inicio + LINHAS_POR_BLOCO_METRICAS]
+                finito = np.isfinite(bloco)
+                alcancados.extend((finito.sum(axis=1) - 1).tolist())
+                somas.extend(np.where(finito, bloco, 0.0).sum(axis=1).tolist())
+                excentricidades.extend(np.where(finito, bloco, 0.0).max(axis=1, initial=0.0).tolist())
+            if all(valor.is_integer() for valor in excentricidades):
+                # Mantém distâncias inteiras como int, como em matrizes_numpy_para_listas
+                excentricidades = [int(valor) for valor in excentricidades]
+        else:
+            dist, _, lista_nos = self.calcular_caminhos_minimos()
+            infinito = float('inf')
+            alcancados, somas, excentricidades = [], [], []
+            for linha in dist:
+                # A diagonal (distância 0) entra na lista sem alterar a soma nem o máximo
+                finitas = [d for d in linha if d != infinito]
+                alcancados.append(len(finitas) - 1)
+                somas.append(sum(finitas))
+                excentricidades.append(max(finitas))
+        
+        n = len(lista_nos)
+        contagem = sum(alcancados)
+        proximidade = {}
+        for i, no in enumerate(lista_nos):
+            r = alcancados[i]
+            proximidade[no] = (r / (n - 1)) * (r / somas[i]) if r > 0 and somas[i] > 0 else 0.0
+        excentricidade = dict(zip(lista_nos, excentricidades))
+        com_alcance = [excentricidades[i] for i in range(n) if alcancados[i] > 0]
+        return {
+            "comprimento_medio_caminho": sum(somas) / contagem if contagem > 0 else 0,
+            "diametro": max(excentricidades) if n > 0 else 0,
+            "raio": min(com_alcance) if com_alcance else 0,
+            "excentricidade": excentricidade,
+            "excentricidade_deposito": excentricidade.get(self.deposito),
+            "centralidade_proximidade": proximidade,
+        }
+
+class Ligacao(namedtuple("Ligacao", ("custo", "demanda", "requerido", "custo_servico"))):
+    """
+    Registro de uma aresta ou arco: (custo, demanda, requerido, custo_servico). Continua sendo
+    uma tupla (desempacotável como antes), sem __dict__ por instância.
+    """
+    __slots__ = ()
+
+class MultigrafoOrientado(AlgoritmosGrafo):
     """
     Implementação de um multigrafo orientado usando a biblioteca padrão do Python.
     """
     def __init__(self):
         # Estrutura principal do grafo
         self.nos = set()  # Conjunto de todos os nós
-        self.arestas = {}  # Dicionário para armazenar arestas não direcionadas: {(u, v): [(custo, demanda, eh_requerido, custo_servico)]}
-        self.arcos = {}   # Dicionário para armazenar arcos direcionados: {(u, v): [(custo, demanda, eh_requerido, custo_servico)]}
+        self.arestas = {}  # Dicionário para armazenar arestas não direcionadas: {(u, v): [Ligacao(custo, demanda, eh_requerido, custo_servico)]}
+        self.arcos = {}   # Dicionário para armazenar arcos direcionados: {(u, v): [Ligacao(custo, demanda, eh_requerido, custo_servico)]}
+        # Menor custo para ir de u a v por uma aresta ou um arco, mantido a cada alteração: {(u, v): custo}
+        self.custos_minimos = {}
         
         # Atributos dos nós
         self.demandas_nos = {}  # Dicionário para armazenar demandas dos nós: {no: demanda}
         self.custos_servico_nos = {}  # Dicionário para armazenar custos de serviço dos nós: {no: custo_servico}
         self.nos_requeridos = set()  # Conjunto de nós requeridos
         
+        # Índices de adjacência mantidos a cada inserção (evitam varrer todas as arestas/arcos)
+        self.adjacencia_arestas = defaultdict(set)  # {no: {vizinhos por arestas não direcionadas}}
+        self.adjacencia_saida = defaultdict(set)  # {no: {vizinhos por arcos de saída}}
+        self.adjacencia_entrada = defaultdict(set)  # {no: {vizinhos por arcos de entrada}}
+        self.grau_arestas = defaultdict(int)  # {no: número de arestas incidentes}
+        self.grau_saida = defaultdict(int)  # {no: número de arcos de saída}
+        self.grau_entrada = defaultdict(int)  # {no: número de arcos de entrada}
+        
+        # Resultado de calcular_caminhos_minimos (dist, pred, lista_nos); alterações em ligações entre
+        # nós existentes o atualizam incrementalmente, as demais o descartam
+        self._cache_caminhos = None
+        self._cache_matrizes_numpy = None  # Mesmo resultado em matrizes numpy, quando calculado por esse motor
+        
         # Informações adicionais
         self.deposito = None
         self.veiculos = 0
@@ -32,6 +677,8 @@ class MultigrafoOrientado:
 
     def adicionar_no(self, no, demanda=0, custo_servico=0, requerido=False):
         """Adiciona um nó ao grafo com atributos opcionais."""
+        if no not in self.nos:
+            self.invalidar_cache()
         self.nos.add(no)
         if requerido:
             self.nos_requeridos.add(no)
@@ -40,6 +687,7 @@ class MultigrafoOrientado:
 
     def adicionar_aresta(self, u, v, custo, demanda=0, custo_servico=0, requerido=False):
         """Adiciona uma aresta não direcionada entre os nós u e v."""
+        custos_anteriores = self._registrar_custos_pares([(u, v), (v, u)])
         self.nos.add(u)
         self.nos.add(v)
         
@@ -48,10 +696,22 @@ class MultigrafoOrientado:
         if chave_aresta not in self.arestas:
             self.arestas[chave_aresta] = []
         
-        self.arestas[chave_aresta].append((custo, demanda, requerido, custo_servico))
+        self.arestas[chave_aresta].append(Ligacao(custo, demanda, requerido, custo_servico))
+        self._reduzir_custo_minimo(u, v, custo)
+        self._reduzir_custo_minimo(v, u, custo)
+        
+        # Atualiza os índices de adjacência e os contadores de grau
+        self.adjacencia_arestas[u].add(v)
+        self.adjacencia_arestas[v].add(u)
+        self.grau_arestas[u] += 1
+        if v != u:
+            self.grau_arestas[v] += 1
+        
+        self._atualizar_caminhos(custos_anteriores)
 
     def adicionar_arco(self, u, v, custo, demanda=0, custo_servico=0, requerido=False):
         """Adiciona um arco direcionado do nó u para o nó v."""
+        custos_anteriores = self._registrar_custos_pares([(u, v)])
         self.nos.add(u)
         self.nos.add(v)
         
@@ -59,40 +719,156 @@ class MultigrafoOrientado:
         if chave_arco not in self.arcos:
             self.arcos[chave_arco] = []
         
-        self.arcos[chave_arco].append((custo, demanda, requerido, custo_servico))
+        self.arcos[chave_arco].append(Ligacao(custo, demanda, requerido, custo_servico))
+        self._reduzir_custo_minimo(u, v, custo)
+        
+        # Atualiza os índices de adjacência e os contadores de grau
+        self.adjacencia_saida[u].add(v)
+        self.adjacencia_entrada[v].add(u)
+        self.grau_saida[u] += 1
+        self.grau_entrada[v] += 1
+        
+        self._atualizar_caminhos(custos_anteriores)
 
-    def obter_vizinhos(self, no):
-        """Obtém todos os vizinhos de um nó (tanto de arestas quanto de arcos)."""
-        vizinhos = set()
+    def alterar_custo_aresta(self, u, v, novo_custo, indice=0):
+        """
+        Altera o custo da aresta paralela de posição indice entre u e v, atualizando os
+        caminhos mínimos já calculados de forma incremental.
+        """
+        chave_aresta = tuple(sorted([u, v]))
+        custos_anteriores = self._registrar_custos_pares([(u, v), (v, u)])
+        self.arestas[chave_aresta][indice] = self.arestas[chave_aresta][indice]._replace(custo=novo_custo)
+        self._recalcular_custos_minimos([(u, v), (v, u)])
+        self._atualizar_caminhos(custos_anteriores)
+
+    def alterar_custo_arco(self, u, v, novo_custo, indice=0):
+        """
+        Altera o custo do arco paralelo de posição indice de u para v, atualizando os
+        caminhos mínimos já calculados de forma incremental.
+        """
+        custos_anteriores = self._registrar_custos_pares([(u, v)])
+        self.arcos[(u, v)][indice] = self.arcos[(u, v)][indice]._replace(custo=novo_custo)
+        self._recalcular_custos_minimos([(u, v)])
+        self._atualizar_caminhos(custos_anteriores)
+
+    def remover_aresta(self, u, v, indice=0):
+        """Remove a aresta paralela de posição indice entre u e v (os nós permanecem no grafo)."""
+        chave_aresta = tuple(sorted([u, v]))
+        custos_anteriores = self._registrar_custos_pares([(u, v), (v, u)])
+        del self.arestas[chave_aresta][indice]
+        if not self.arestas[chave_aresta]:
+            del self.arestas[chave_aresta]
+            self.adjacencia_arestas[u].discard(v)
+            self.adjacencia_arestas[v].discard(u)
         
-        # Adiciona vizinhos de arestas não direcionadas
-        for aresta in self.arestas:
-            if no in aresta:
-                u, v = aresta
-                vizinhos.add(v if u == no else u)
+        self.grau_arestas[u] -= 1
+        if v != u:
+            self.grau_arestas[v] -= 1
         
-        # Adiciona vizinhos de arcos de saída
-        for arco in self.arcos:
-            if arco[0] == no:
-                vizinhos.add(arco[1])
+        self._recalcular_custos_minimos([(u, v), (v, u)])
+        self._atualizar_caminhos(custos_anteriores)
+
+    def remover_arco(self, u, v, indice=0):
+        """Remove o arco paralelo de posição indice de u para v (os nós permanecem no grafo)."""
+        custos_anteriores = self._registrar_custos_pares([(u, v)])
+        del self.arcos[(u, v)][indice]
+        if not self.arcos[(u, v)]:
+            del self.arcos[(u, v)]
+            self.adjacencia_saida[u].discard(v)
+            self.adjacencia_entrada[v].discard(u)
         
-        return vizinhos
+        self.grau_saida[u] -= 1
+        self.grau_entrada[v] -= 1
+        
+        self._recalcular_custos_minimos([(u, v)])
+        self._atualizar_caminhos(custos_anteriores)
+
+    def _reduzir_custo_minimo(self, u, v, custo):
+        """Registra uma nova ligação de u para v com o custo dado em custos_minimos."""
+        if custo < self.custos_minimos.get((u, v), math.inf):
+            self.custos_minimos[(u, v)] = custo
+
+    def _recalcular_custos_minimos(self, pares):
+        """Recalcula custos_minimos dos pares (u, v) a partir das ligações atuais de cada par."""
+        for u, v in pares:
+            custo = min(self.obter_custo_aresta(u, v), self.obter_custo_arco(u, v))
+            if custo == math.inf:
+                self.custos_minimos.pop((u, v), None)
+            else:
+                self.custos_minimos[(u, v)] = custo
+
+    def _registrar_custos_pares(self, pares):
+        """
+        Guarda o custo mínimo atual dos pares (u, v) que uma alteração vai afetar, para a
+        atualização incremental dos caminhos mínimos. Retorna None quando não há resultado
+        guardado ou quando a alteração envolve nós novos (o resultado será descartado).
+        """
+        if self._cache_caminhos is None or any(u not in self.nos or v not in self.nos for u, v in pares):
+            return None
+        return {(u, v): self.obter_custo_minimo(u, v) for u, v in pares}
+
+    def _atualizar_caminhos(self, custos_anteriores):
+        """
+        Atualiza as matrizes guardadas após a alteração dos pares registrados em custos_anteriores.
+        
+        Se o custo mínimo de um par (a, b) diminuiu, cada linha i é relaxada por
+        dist[i][a] + custo + dist[b][j], em O(n²). Se aumentou, apenas as origens i em que a
+        ligação era justa (dist[i][a] + custo_anterior == dist[i][b]) podem ter usado o par em
+        algum caminho mínimo; somente essas linhas são recalculadas com Dijkstra.
+        """
+        if custos_anteriores is None:
+            self.invalidar_cache()
+            return
+        
+        self._cache_matrizes_numpy = None
+        reducoes, aumentos = [], []
+        for (u, v), custo_anterior in custos_anteriores.items():
+            custo_atual = self.obter_custo_minimo(u, v)
+            if custo_atual < custo_anterior:
+                reducoes.append((u, v, custo_atual))
+            elif custo_atual > custo_anterior:
+                aumentos.append((u, v, custo_anterior))
+        
+        if reducoes and aumentos:
+            # Não ocorre com uma única ligação; por segurança, recalcula do zero
+            self.invalidar_cache()
+            return
+        
+        dist, pred, lista_nos = self._cache_caminhos
+        no_para_indice = {no: i for i, no in enumerate(lista_nos)}
+        
+        if aumentos:
+            afetadas = set()
+            for u, v, custo_anterior in aumentos:
+                a, b = no_para_indice[u], no_para_indice[v]
+                afetadas.update(i for i in range(len(lista_nos))
+                                if dist[i][a] + custo_anterior == dist[i][b] != float('inf'))
+            afetadas = sorted(afetadas)
+            adjacencia = self.obter_adjacencia_indexada(lista_nos)
+            novas_dist, novos_pred = calcular_linhas_dijkstra(adjacencia, afetadas)
+            for i, linha_dist, linha_pred in zip(afetadas, novas_dist, novos_pred):
+                dist[i] = linha_dist
+                pred[i] = linha_pred
+        
+        for u, v, custo in reducoes:
+            relaxar_reducao_custo(dist, pred, no_para_indice[u], no_para_indice[v], custo)
+
+    def invalidar_cache(self):
+        """Descarta os resultados de caminhos mínimos calculados anteriormente."""
+        self._cache_caminhos = None
+        self._cache_matrizes_numpy = None
+
+    def obter_vizinhos(self, no):
+        """Obtém todos os vizinhos de um nó (tanto de arestas quanto de arcos)."""
+        return self.adjacencia_arestas.get(no, set()) | self.adjacencia_saida.get(no, set())
 
     def obter_vizinhos_saida(self, no):
         """Obtém vizinhos conectados por arcos de saída."""
-        vizinhos = set()
-        for arco in self.arcos:
-            if arco[0] == no:
-                vizinhos.add(arco[1])
-        return vizinhos
+        return set(self.adjacencia_saida.get(no, ()))
 
     def obter_vizinhos_entrada(self, no):
         """Obtém vizinhos conectados por arcos de entrada."""
-        vizinhos = set()
-        for arco in self.arcos:
-            if arco[1] == no:
-                vizinhos.add(arco[0])
-        return vizinhos
+        return set(self.adjacencia_entrada.get(no, ()))
 
     def obter_custo_aresta(self, u, v):
         """Obtém o custo mínimo de uma aresta entre u e v."""
@@ -109,162 +885,68 @@ class MultigrafoOrientado:
 
     def obter_custo_minimo(self, u, v):
         """Obtém o custo mínimo para ir de u para v (considerando arestas e arcos)."""
-        custo_aresta = self.obter_custo_aresta(u, v)
-        custo_arco = self.obter_custo_arco(u, v)
-        return min(custo_aresta, custo_arco)
+        return self.custos_minimos.get((u, v), math.inf)
 
     def obter_grau(self, no):
         """Obtém o grau de um nó (número de arestas e arcos conectados)."""
-        grau = 0
-        
-        # Conta arestas não direcionadas
-        for aresta in self.arestas:
-            if no in aresta:
-                grau += len(self.arestas[aresta])
-        
-        # Conta arcos de saída
-        for arco in self.arcos:
-            if arco[0] == no:
-                grau += len(self.arcos[arco])
-        
-        # Conta arcos de entrada
-        for arco in self.arcos:
-            if arco[1] == no:
-                grau += len(self.arcos[arco])
-        
-        return grau
+        return self.obter_grau_arestas(no) + self.obter_grau_saida(no) + self.obter_grau_entrada(no)
+
+    def obter_grau_arestas(self, no):
+        """Obtém o número de arestas não direcionadas incidentes a um nó."""
+        return self.grau_arestas.get(no, 0)
 
     def obter_grau_saida(self, no):
         """Obtém o grau de saída de um nó (número de arcos de saída)."""
-        grau = 0
-        for arco in self.arcos:
-            if arco[0] == no:
-                grau += len(self.arcos[arco])
-        return grau
+        return self.grau_saida.get(no, 0)
 
     def obter_grau_entrada(self, no):
         """Obtém o grau de entrada de um nó (número de arcos de entrada)."""
-        grau = 0
-        for arco in self.arcos:
-            if arco[1] == no:
-                grau += len(self.arcos[arco])
-        return grau
+        return self.grau_entrada.get(no, 0)
 
-    def calcular_caminhos_minimos(self):
+    def obter_adjacencia_indexada(self, lista_nos):
         """
-        Calcula os caminhos mínimos entre todos os pares de nós usando o algoritmo de Floyd-Warshall.
-        Retorna a matriz de distâncias e a matriz de predecessores.
+        Retorna a lista de adjacência por índice: adjacencia[i] = [(j, custo_minimo), ...]
+        para cada vizinho de lista_nos[i], considerando arestas e arcos de saída.
         """
-        lista_nos = sorted(list(self.nos))
-        n = len(lista_nos)
         no_para_indice = {no: i for i, no in enumerate(lista_nos)}
-        
-        # Inicializa matrizes de distância e predecessores
-        dist = [[float('inf') for _ in range(n)] for _ in range(n)]
-        pred = [[-1 for _ in range(n)] for _ in range(n)]
-        
-        # Define a diagonal como 0
-        for i in range(n):
-            dist[i][i] = 0
-        
-        # Inicializa com conexões diretas
-        for u in self.nos:
-            for v in self.obter_vizinhos(u):
-                i, j = no_para_indice[u], no_para_indice[v]
-                custo = self.obter_custo_minimo(u, v)
-                if custo < dist[i][j]:
-                    dist[i][j] = custo
-                    pred[i][j] = i
-        
-        # Algoritmo de Floyd-Warshall
-        for k in range(n):
-            for i in range(n):
-                for j in range(n):
-                    if dist[i][k] + dist[k][j] < dist[i][j]:
-                        dist[i][j] = dist[i][k] + dist[k][j]
-                        pred[i][j] = pred[k][j]
-        
-        return dist, pred, lista_nos
-
-    def calcular_componentes_conectados(self):
-        """Calcula o número de componentes conectados no grafo."""
-        visitados = set()
-        componentes = 0
-        
-        def dfs(no):
-            visitados.add(no)
-            for vizinho in self.obter_vizinhos(no):
-                if vizinho not in visitados:
-                    dfs(vizinho)
-        
-        for no in self.nos:
-            if no not in visitados:
-                componentes += 1
-                dfs(no)
-        
-        return componentes
+        custos_minimos = self.custos_minimos
+        adjacencia = []
+        for u in lista_nos:
+            adjacencia.append([(no_para_indice[v], custos_minimos[(u, v)]) for v in self.obter_vizinhos(u)])
+        return adjacencia
 
-    def calcular_centralidade_intermediacao(self):
+    def obter_adjacencia_multiplicidade(self, lista_nos):
         """
-        Calcula a centralidade de intermediação para todos os nós com base nos caminhos mínimos.
+        Como obter_adjacencia_indexada, mas cada vizinho vem como (j, custo_minimo, multiplicidade),
+        onde multiplicidade é o número de ligações paralelas (arestas e arcos) com o custo mínimo.
         """
-        dist, pred, lista_nos = self.calcular_caminhos_minimos()
-        n = len(lista_nos)
         no_para_indice = {no: i for i, no in enumerate(lista_nos)}
-        
-        # Inicializa valores de intermediação
-        intermediacao = {no: 0 for no in self.nos}
-        
-        # Para cada par de nós
-        for s in self.nos:
-            for t in self.nos:
-                if s == t:
-                    continue
-                
-                # Reconstrói o caminho mínimo de s para t
-                caminho = []
-                atual = t
-                while atual != s and atual != -1:
-                    caminho.append(atual)
-                    i, j = no_para_indice[s], no_para_indice[atual]
-                    if pred[i][j] == -1:
-                        break
-                    atual = lista_nos[pred[i][j]]
-                
-                # Se o caminho existe e tem nós intermediários
-                if atual == s and len(caminho) > 1:
-                    caminho.reverse()
-                    # Incrementa a intermediação para nós intermediários
-                    for no in caminho[:-1]:
-                        intermediacao[no] += 1
-        
-        return intermediacao
+        adjacencia = []
+        for u in lista_nos:
+            vizinhos = []
+            for v in self.obter_vizinhos(u):
+                custo = self.obter_custo_minimo(u, v)
+                vizinhos.append((no_para_indice[v], custo, self.contar_ligacoes_custo(u, v, custo)))
+            adjacencia.append(vizinhos)
+        return adjacencia
 
-    def calcular_comprimento_medio_caminho(self):
-        """Calcula o comprimento médio do caminho no grafo."""
-        dist, _, _ = self.calcular_caminhos_minimos()
-        comprimento_total = 0
-        contagem = 0
-        
-        for i in range(len(dist)):
-            for j in range(len(dist)):
-                if i != j and dist[i][j] != float('inf'):
-                    comprimento_total += dist[i][j]
-                    contagem += 1
-        
-        return comprimento_total / contagem if contagem > 0 else 0
+    def contar_ligacoes_custo(self, u, v, custo):
+        """Conta as arestas entre u e v e os arcos de u para v com exatamente o custo dado."""
+        ligacoes = self.arestas.get(tuple(sorted([u, v])), []) + self.arcos.get((u, v), [])
+        return sum(1 for custo_ligacao, _, _, _ in ligacoes if custo_ligacao == custo)
 
-    def calcular_diametro(self):
-        """Calcula o diâmetro do grafo (caminho mínimo mais longo)."""
-        dist, _, _ = self.calcular_caminhos_minimos()
-        diametro = 0
-        
-        for i in range(len(dist)):
-            for j in range(len(dist)):
-                if i != j and dist[i][j] != float('inf'):
-                    diametro = max(diametro, dist[i][j])
-        
-        return diametro
+    def obter_nos_servico(self):
+        """Retorna o conjunto dos nós requeridos e das extremidades de arestas e arcos requeridos."""
+        nos = set(self.nos_requeridos)
+        for ligacoes in (self.arestas, self.arcos):
+            for (u, v), lista in ligacoes.items():
+                if any(requerido for _, _, requerido, _ in lista):
+                    nos.update((u, v))
+        return nos
+
+    def para_csr(self):
+        """Gera uma visão compacta e imutável (GrafoCSR) do estado atual do grafo."""
+        return GrafoCSR(self)
 
     def calcular_densidade(self):
         """Calcula a densidade do grafo."""
@@ -278,251 +960,1786 @@ class MultigrafoOrientado:
         
         return (m + a) / max_conexoes if max_conexoes > 0 else 0
 
-    def calcular_estatisticas(self):
-        """Calcula e retorna todas as estatísticas do grafo."""
-        estatisticas = {}
+    def listar_tarefas_servico(self):
+        """
+        Lista as tarefas atendidas pelas rotas: o depósito, cada nó requerido, cada aresta
+        requerida nos dois sentidos e cada arco requerido no seu sentido. Cada tarefa é um
+        dicionário com:
         
-        # Contagens básicas
-        estatisticas["num_nos"] = len(self.nos)
-        estatisticas["num_arestas"] = sum(len(arestas) for arestas in self.arestas.values())
-        estatisticas["num_arcos"] = sum(len(arcos) for arcos in self.arcos.values())
-        estatisticas["num_nos_requeridos"] = len(self.nos_requeridos)
+        - tipo: "deposito", "no", "aresta" ou "arco";
+        - servico: índice do serviço (os dois sentidos de uma aresta compartilham o índice);
+        - inicio e fim: nós em que o atendimento começa e termina (iguais para depósito e nós);
+        - demanda, custo_servico e custo (custo de travessia da ligação; 0 para nós).
         
-        # Conta arestas e arcos requeridos
-        arestas_requeridas = 0
-        for lista_arestas in self.arestas.values():
-            for _, _, requerido, _ in lista_arestas:
-                if requerido:
-                    arestas_requeridas += 1
+        Ligações paralelas requeridas são serviços distintos.
+        """
+        tarefas = []
         
-        arcos_requeridos = 0
-        for lista_arcos in self.arcos.values():
-            for _, _, requerido, _ in lista_arcos:
+        def adicionar(tipo, servico, inicio, fim, demanda=0, custo_servico=0, custo=0):
+            tarefas.append({"tipo": tipo, "servico": servico, "inicio": inicio, "fim": fim,
+                            "demanda": demanda, "custo_servico": custo_servico, "custo": custo})
+        
+        servico = 0
+        if self.deposito is not None:
+            adicionar("deposito", servico, self.deposito, self.deposito)
+            servico += 1
+        for no in sorted(self.nos_requeridos):
+            adicionar("no", servico, no, no, self.demandas_nos.get(no, 0), self.custos_servico_nos.get(no, 0))
+            servico += 1
+        for (u, v), lista_arestas in sorted(self.arestas.items()):
+            for custo, demanda, requerido, custo_servico in lista_arestas:
+                if requerido:
+                    adicionar("aresta", servico, u, v, demanda, custo_servico, custo)
+                    if u != v:
+                        adicionar("aresta", servico, v, u, demanda, custo_servico, custo)
+                    servico += 1
+        for (u, v), lista_arcos in sorted(self.arcos.items()):
+            for custo, demanda, requerido, custo_servico in lista_arcos:
                 if requerido:
-                    arcos_requeridos += 1
+                    adicionar("arco", servico, u, v, demanda, custo_servico, custo)
+                    servico += 1
+        return tarefas
+
+    def calcular_matriz_servicos(self):
+        """
+        Calcula a matriz de custos entre as tarefas de listar_tarefas_servico, entrada das
+        heurísticas de construção de rotas: custos[i][j] é a distância mínima do fim da tarefa i
+        ao início da tarefa j (inf quando não há caminho). Os custos de atendimento e de
+        travessia das próprias ligações ficam nas tarefas.
         
-        estatisticas["num_arestas_requeridas"] = arestas_requeridas
-        estatisticas["num_arcos_requeridos"] = arcos_requeridos
+        Executa Dijkstra apenas a partir dos nós finais das tarefas e guarda só as colunas dos
+        nós iniciais, de modo que a memória é O(k²) no número k de tarefas (mais O(n + m) para
+        a adjacência), em vez de O(n²). Se a matriz completa de caminhos mínimos já estiver
+        calculada, as distâncias são lidas dela.
         
-        # Calcula densidade
-        estatisticas["densidade"] = self.calcular_densidade()
+        Retorna {"tarefas": [...], "custos": [[...], ...]}; tarefas com o mesmo nó final
+        compartilham a mesma linha de custos, que não deve ser modificada.
+        """
+        tarefas = self.listar_tarefas_servico()
+        lista_nos = sorted(list(self.nos))
+        no_para_indice = {no: i for i, no in enumerate(lista_nos)}
         
-        # Calcula componentes conectados
-        estatisticas["componentes_conectados"] = self.calcular_componentes_conectados()
+        fins = sorted({tarefa["fim"] for tarefa in tarefas}, key=lambda no: no_para_indice[no])
+        colunas = [no_para_indice[tarefa["inicio"]] for tarefa in tarefas]
         
-        # Calcula graus mínimo e máximo
-        graus = [self.obter_grau(no) for no in self.nos]
-        estatisticas["grau_minimo"] = min(graus) if graus else 0
-        estatisticas["grau_maximo"] = max(graus) if graus else 0
+        if self._cache_caminhos is not None:
+            dist = self._cache_caminhos[0]
+            linhas = {fim: [dist[no_para_indice[fim]][j] for j in colunas] for fim in fins}
+        else:
+            adjacencia = self.obter_adjacencia_indexada(lista_nos)
+            linhas = {}
+            with medir("dijkstra_servicos", origens=len(fins), tarefas=len(tarefas)):
+                for fim in fins:
+                    dist, _ = dijkstra_origem(adjacencia, no_para_indice[fim])
+                    linhas[fim] = [dist[j] for j in colunas]
         
-        # Calcula centralidade de intermediação
-        intermediacao = self.calcular_centralidade_intermediacao()
-        estatisticas["centralidade_intermediacao"] = intermediacao
+        custos = [linhas[tarefa["fim"]] for tarefa in tarefas]
+        return {"tarefas": tarefas, "custos": custos}
+
+    def calcular_estatisticas(self, opcoes_intermediacao=None, metricas=None, preguicoso=False):
+        """
+        Calcula e retorna as estatísticas do grafo.
         
-        # Calcula comprimento médio do caminho
-        estatisticas["comprimento_medio_caminho"] = self.calcular_comprimento_medio_caminho()
+        opcoes_intermediacao aceita os parâmetros de estimar_centralidade_intermediacao (amostras,
+        estrategia, semente, tempo_limite, confianca); com amostras ou tempo_limite, a intermediação
+        é estimada por amostragem e o resumo da estimativa fica em "intermediacao_aproximada".
         
-        # Calcula diâmetro
-        estatisticas["diametro"] = self.calcular_diametro()
+        metricas restringe o resultado aos campos de METRICAS_ESTATISTICAS indicados (por padrão,
+        todos). Com preguicoso=True, retorna um EstatisticasPreguicosas em que cada campo só é
+        calculado no primeiro acesso. Os campos de contagem, densidade, componentes, graus e
+        dados da instância nunca acionam o cálculo de caminhos mínimos.
+        """
+        calculos = self._calculos_estatisticas(opcoes_intermediacao)
+        if metricas is not None:
+            desconhecidas = [nome for nome in metricas if nome not in METRICAS_ESTATISTICAS]
+            if desconhecidas:
+                raise ValueError(f"Métricas desconhecidas: {', '.join(desconhecidas)}. "
+                                 f"Opções: {', '.join(METRICAS_ESTATISTICAS)}.")
+            selecionadas = set(metricas)
+            if "centralidade_intermediacao" in selecionadas:
+                selecionadas.add("intermediacao_aproximada")
+            calculos = {nome: calculo for nome, calculo in calculos.items() if nome in selecionadas}
+        
+        estatisticas = EstatisticasPreguicosas(calculos)
+        if preguicoso:
+            return estatisticas
+        return dict(estatisticas)
+    
+    def _calculos_estatisticas(self, opcoes_intermediacao=None):
+        """
+        Retorna {campo: função sem argumentos que o calcula}, na ordem de exportação dos campos.
+        Cálculos compartilhados por mais de um campo (graus, estimativa da intermediação) são
+        feitos uma única vez.
+        """
+        memoria = {}
+        
+        def uma_vez(chave, calculo):
+            if chave not in memoria:
+                memoria[chave] = calculo()
+            return memoria[chave]
+        
+        def contar_requeridas(ligacoes):
+            return sum(1 for lista in ligacoes.values() for _, _, requerido, _ in lista if requerido)
+        
+        def graus():
+            return uma_vez("graus", lambda: [self.obter_grau(no) for no in self.nos])
+        
+        calculos = {
+            # Contagens básicas
+            "num_nos": lambda: len(self.nos),
+            "num_arestas": lambda: sum(len(arestas) for arestas in self.arestas.values()),
+            "num_arcos": lambda: sum(len(arcos) for arcos in self.arcos.values()),
+            "num_nos_requeridos": lambda: len(self.nos_requeridos),
+            "num_arestas_requeridas": lambda: contar_requeridas(self.arestas),
+            "num_arcos_requeridos": lambda: contar_requeridas(self.arcos),
+            "densidade": self.calcular_densidade,
+            "componentes_conectados": self.calcular_componentes_conectados,
+            "componentes_fortemente_conectados": lambda: len(self.calcular_componentes_fortes()),
+            "grau_minimo": lambda: min(graus()) if graus() else 0,
+            "grau_maximo": lambda: max(graus()) if graus() else 0,
+        }
+        
+        # Centralidade de intermediação (exata ou estimada por amostragem)
+        opcoes_intermediacao = opcoes_intermediacao or {}
+        if opcoes_intermediacao.get("amostras") is not None or opcoes_intermediacao.get("tempo_limite") is not None:
+            def estimativa():
+                return uma_vez("intermediacao", lambda: self.estimar_centralidade_intermediacao(**opcoes_intermediacao))
+            calculos["centralidade_intermediacao"] = lambda: estimativa()["valores"]
+            calculos["intermediacao_aproximada"] = lambda: {chave: valor for chave, valor in estimativa().items()
+                                                            if chave != "valores"}
+        else:
+            calculos["centralidade_intermediacao"] = self.calcular_centralidade_intermediacao
+        
+        # Métricas sobre a matriz de caminhos mínimos, todas da mesma varredura
+        def metricas_caminhos():
+            return uma_vez("caminhos", self.calcular_metricas_caminhos)
+        for campo in METRICAS_CAMINHOS:
+            calculos[campo] = lambda campo=campo: metricas_caminhos()[campo]
         
         # Informações adicionais
-        estatisticas["nome"] = self.nome
-        estatisticas["deposito"] = self.deposito
-        estatisticas["veiculos"] = self.veiculos
-        estatisticas["capacidade"] = self.capacidade
-        estatisticas["valor_otimo"] = self.valor_otimo
+        calculos["nome"] = lambda: self.nome
+        calculos["deposito"] = lambda: self.deposito
+        calculos["veiculos"] = lambda: self.veiculos
+        calculos["capacidade"] = lambda: self.capacidade
+        calculos["valor_otimo"] = lambda: self.valor_otimo
         
-        return estatisticas
+        return calculos
 
-def analisar_arquivo_dat(caminho_arquivo):
+class EstatisticasPreguicosas(Mapping):
     """
-    Analisa um arquivo .dat e retorna um objeto MultigrafoOrientado.
+    Mapeamento somente leitura de estatísticas em que cada campo é calculado no primeiro acesso
+    e memorizado. As chaves são conhecidas de antemão, então len, in e a iteração pelas chaves
+    não calculam nada; items, values e dict(...) calculam todos os campos.
     """
-    grafo = MultigrafoOrientado()
+    def __init__(self, calculos):
+        self._calculos = calculos
+        self._valores = {}
+
+    def __getitem__(self, chave):
+        if chave not in self._valores:
+            calculo = self._calculos[chave]
+            with medir(f"estatisticas.{chave}"):
+                self._valores[chave] = calculo()
+        return self._valores[chave]
+
+    def __iter__(self):
+        return iter(self._calculos)
+
+    def __len__(self):
+        return len(self._calculos)
+
+    def calculadas(self):
+        """Campos já calculados até o momento."""
+        return [chave for chave in self._calculos if chave in self._valores]
+
+    def __repr__(self):
+        campos = ", ".join(f"{chave!r}: {self._valores[chave]!r}" if chave in self._valores else f"{chave!r}: ..."
+                           for chave in self._calculos)
+        return f"{type(self).__name__}({{{campos}}})"
+
+class GrafoCSR(AlgoritmosGrafo):
+    """
+    Visão compacta e imutável de um MultigrafoOrientado no formato CSR (compressed sparse row).
+    
+    Os nós são indexados de 0 a n - 1 na ordem de lista_nos. Cada ligação (aresta ou arco)
+    ocupa uma posição nas colunas tipadas origem, destino, custo, demanda, requerido,
+    custo_servico e direcionado. As adjacências de saída e de entrada do nó i são os índices
+    de ligação ligacoes_saida[inicio_saida[i]:inicio_saida[i + 1]] (e o equivalente de
+    entrada); arestas aparecem nas duas pontas. O vizinho de i por uma ligação l é
+    origem[l] + destino[l] - i.
+    """
+    __slots__ = (
+        "lista_nos", "no_para_indice", "nos",
+        "origem", "destino", "custo", "demanda", "requerido", "custo_servico", "direcionado",
+        "inicio_saida", "ligacoes_saida", "inicio_entrada", "ligacoes_entrada",
+        "grau_arestas", "grau_saida", "grau_entrada",
+        "no_requerido", "demanda_no", "custo_servico_no",
+        "deposito", "veiculos", "capacidade", "valor_otimo", "nome",
+        "_cache_caminhos", "_cache_matrizes_numpy",
+    )
+
+    # Atributos que continuam graváveis depois da construção (resultados guardados)
+    _ATRIBUTOS_CACHE = ("_cache_caminhos", "_cache_matrizes_numpy")
+
+    def __init__(self, grafo):
+        """Constrói a visão CSR a partir de um MultigrafoOrientado."""
+        definir = super().__setattr__
+        lista_nos = sorted(list(grafo.nos))
+        no_para_indice = {no: i for i, no in enumerate(lista_nos)}
+        n = len(lista_nos)
+        definir("lista_nos", lista_nos)
+        definir("no_para_indice", no_para_indice)
+        definir("nos", frozenset(lista_nos))
+        
+        # Colunas das ligações: primeiro as arestas, depois os arcos
+        ligacoes = [(chave, lista, 0) for chave, lista in grafo.arestas.items()]
+        ligacoes += [(chave, lista, 1) for chave, lista in grafo.arcos.items()]
+        valores_custo = [custo for _, lista, _ in ligacoes for custo, _, _, _ in lista]
+        tipo_custo = 'q' if all(isinstance(custo, int) for custo in valores_custo) else 'd'
+        
+        origem, destino, direcionado = array('i'), array('i'), array('b')
+        custo, demanda, requerido, custo_servico = array(tipo_custo), array('q'), array('b'), array('q')
+        for (u, v), lista, eh_arco in ligacoes:
+            for custo_ligacao, demanda_ligacao, eh_requerido, custo_servico_ligacao in lista:
+                origem.append(no_para_indice[u])
+                destino.append(no_para_indice[v])
+                direcionado.append(eh_arco)
+                custo.append(custo_ligacao)
+                demanda.append(demanda_ligacao)
+                requerido.append(1 if eh_requerido else 0)
+                custo_servico.append(custo_servico_ligacao)
+        for nome_coluna, coluna in (("origem", origem), ("destino", destino), ("direcionado", direcionado),
+                                    ("custo", custo), ("demanda", demanda), ("requerido", requerido),
+                                    ("custo_servico", custo_servico)):
+            definir(nome_coluna, coluna)
+        
+        # Graus e adjacências de saída/entrada por ordenação por contagem
+        grau_arestas, grau_saida, grau_entrada = array('q', [0]) * n, array('q', [0]) * n, array('q', [0]) * n
+        contagem_saida, contagem_entrada = array('q', [0]) * (n + 1), array('q', [0]) * (n + 1)
+        for l in range(len(origem)):
+            u, v = origem[l], destino[l]
+            if direcionado[l]:
+                grau_saida[u] += 1
+                grau_entrada[v] += 1
+                contagem_saida[u + 1] += 1
+                contagem_entrada[v + 1] += 1
+            else:
+                grau_arestas[u] += 1
+                contagem_saida[u + 1] += 1
+                contagem_entrada[u + 1] += 1
+                if v != u:
+                    grau_arestas[v] += 1
+                    contagem_saida[v + 1] += 1
+                    contagem_entrada[v + 1] += 1
+        for i in range(n):
+            contagem_saida[i + 1] += contagem_saida[i]
+            contagem_entrada[i + 1] += contagem_entrada[i]
+        
+        ligacoes_saida = array('i', [0]) * contagem_saida[n]
+        ligacoes_entrada = array('i', [0]) * contagem_entrada[n]
+        proxima_saida, proxima_entrada = array('q', contagem_saida), array('q', contagem_entrada)
+        for l in range(len(origem)):
+            u, v = origem[l], destino[l]
+            extremos_saida = (u,) if direcionado[l] or v == u else (u, v)
+            extremos_entrada = (v,) if direcionado[l] or v == u else (u, v)
+            for i in extremos_saida:
+                ligacoes_saida[proxima_saida[i]] = l
+                proxima_saida[i] += 1
+            for i in extremos_entrada:
+                ligacoes_entrada[proxima_entrada[i]] = l
+                proxima_entrada[i] += 1
+        
+        definir("inicio_saida", contagem_saida)
+        definir("ligacoes_saida", ligacoes_saida)
+        definir("inicio_entrada", contagem_entrada)
+        definir("ligacoes_entrada", ligacoes_entrada)
+        definir("grau_arestas", grau_arestas)
+        definir("grau_saida", grau_saida)
+        definir("grau_entrada", grau_entrada)
+        
+        # Atributos dos nós
+        definir("no_requerido", array('b', [1 if no in grafo.nos_requeridos else 0 for no in lista_nos]))
+        definir("demanda_no", array('q', [grafo.demandas_nos.get(no, 0) for no in lista_nos]))
+        definir("custo_servico_no", array('q', [grafo.custos_servico_nos.get(no, 0) for no in lista_nos]))
+        
+        # Informações adicionais
+        for atributo in ("deposito", "veiculos", "capacidade", "valor_otimo", "nome"):
+            definir(atributo, getattr(grafo, atributo))
+        
+        definir("_cache_caminhos", None)
+        definir("_cache_matrizes_numpy", None)
+
+    def __setattr__(self, nome, valor):
+        if nome not in self._ATRIBUTOS_CACHE:
+            raise AttributeError("GrafoCSR é imutável; altere o MultigrafoOrientado e gere uma nova visão.")
+        super().__setattr__(nome, valor)
+
+    def coluna_numpy(self, nome):
+        """Retorna uma coluna (ou vetor de deslocamentos) como array numpy, sem cópia."""
+        if np is None:
+            raise RuntimeError("coluna_numpy requer a biblioteca numpy instalada.")
+        coluna = getattr(self, nome)
+        tipos = {'i': np.int32, 'q': np.int64, 'b': np.int8, 'd': np.float64}
+        return np.frombuffer(coluna, dtype=tipos[coluna.typecode])
+
+    def num_ligacoes(self):
+        """Retorna o número total de ligações (arestas e arcos)."""
+        return len(self.origem)
+
+    def _vizinhos_indice(self, i):
+        """Gera (vizinho, ligação) para cada ligação de saída do nó de índice i."""
+        origem, destino = self.origem, self.destino
+        for posicao in range(self.inicio_saida[i], self.inicio_saida[i + 1]):
+            l = self.ligacoes_saida[posicao]
+            yield origem[l] + destino[l] - i, l
+
+    def obter_vizinhos(self, no):
+        """Obtém todos os vizinhos de um nó (tanto de arestas quanto de arcos de saída)."""
+        return {self.lista_nos[j] for j, _ in self._vizinhos_indice(self.no_para_indice[no])}
+
+    def obter_vizinhos_saida(self, no):
+        """Obtém vizinhos conectados por arcos de saída."""
+        return {self.lista_nos[j] for j, l in self._vizinhos_indice(self.no_para_indice[no]) if self.direcionado[l]}
+
+    def obter_vizinhos_entrada(self, no):
+        """Obtém vizinhos conectados por arcos de entrada."""
+        i = self.no_para_indice[no]
+        vizinhos = set()
+        for posicao in range(self.inicio_entrada[i], self.inicio_entrada[i + 1]):
+            l = self.ligacoes_entrada[posicao]
+            if self.direcionado[l]:
+                vizinhos.add(self.lista_nos[self.origem[l]])
+        return vizinhos
+
+    def obter_grau(self, no):
+        """Obtém o grau de um nó (número de arestas e arcos conectados)."""
+        i = self.no_para_indice[no]
+        return self.grau_arestas[i] + self.grau_saida[i] + self.grau_entrada[i]
+
+    def obter_grau_arestas(self, no):
+        """Obtém o número de arestas não direcionadas incidentes a um nó."""
+        return self.grau_arestas[self.no_para_indice[no]]
+
+    def obter_grau_saida(self, no):
+        """Obtém o grau de saída de um nó (número de arcos de saída)."""
+        return self.grau_saida[self.no_para_indice[no]]
+
+    def obter_grau_entrada(self, no):
+        """Obtém o grau de entrada de um nó (número de arcos de entrada)."""
+        return self.grau_entrada[self.no_para_indice[no]]
+
+    def obter_adjacencia_multiplicidade(self, lista_nos):
+        """
+        Retorna adjacencia[i] = [(j, custo_minimo, multiplicidade), ...] para o nó lista_nos[i],
+        onde multiplicidade é o número de ligações paralelas com o custo mínimo.
+        """
+        adjacencia = []
+        for no in lista_nos:
+            melhores = {}  # {vizinho: [custo_minimo, multiplicidade]}
+            for j, l in self._vizinhos_indice(self.no_para_indice[no]):
+                custo = self.custo[l]
+                atual = melhores.get(j)
+                if atual is None or custo < atual[0]:
+                    melhores[j] = [custo, 1]
+                elif custo == atual[0]:
+                    atual[1] += 1
+            adjacencia.append([(j, custo, multiplicidade) for j, (custo, multiplicidade) in melhores.items()])
+        
+        if lista_nos != self.lista_nos:
+            # Reindexa os vizinhos para a ordem de nós pedida
+            indice_pedido = {no: i for i, no in enumerate(lista_nos)}
+            adjacencia = [[(indice_pedido[self.lista_nos[j]], custo, multiplicidade) for j, custo, multiplicidade in vizinhos]
+                          for vizinhos in adjacencia]
+        return adjacencia
+
+    def obter_adjacencia_indexada(self, lista_nos):
+        """Retorna adjacencia[i] = [(j, custo_minimo), ...] para o nó lista_nos[i]."""
+        return [[(j, custo) for j, custo, _ in vizinhos] for vizinhos in self.obter_adjacencia_multiplicidade(lista_nos)]
+
+    def obter_nos_servico(self):
+        """Retorna o conjunto dos nós requeridos e das extremidades de arestas e arcos requeridos."""
+        nos = {self.lista_nos[i] for i, requerido in enumerate(self.no_requerido) if requerido}
+        for l, requerido in enumerate(self.requerido):
+            if requerido:
+                nos.add(self.lista_nos[self.origem[l]])
+                nos.add(self.lista_nos[self.destino[l]])
+        return nos
+
+class GrafoContraido:
+    """
+    Contração de um grafo para o cálculo de caminhos mínimos. Nós que não são de serviço (ver
+    obter_nos_servico) nem o depósito e que têm no máximo dois vizinhos distintos (contando os
+    dois sentidos) são eliminados um a um: cada par entrada a -> x -> saída b vira um atalho
+    a -> b de custo c(a, x) + c(x, b). Assim, cadeias de nós de grau 2 viram uma única ligação.
+    Entre cada par de nós fica apenas a ligação de menor custo, como em obter_custo_minimo, o
+    que também descarta ligações paralelas dominadas.
     
-    with open(caminho_arquivo, 'r') as arquivo:
-        linhas = arquivo.readlines()
+    As distâncias entre os nós mantidos são as mesmas do grafo original. calcular_caminhos_minimos
+    calcula as matrizes do grafo reduzido e as expande, na ordem inversa de eliminação, para
+    todos os nós: D[x][j] = min_b c(x, b) + D[b][j] e D[i][x] = min_a D[i][a] + c(a, x). Os
+    predecessores atravessam os atalhos até o último nó original antes do destino.
     
-    # Analisa informações do cabeçalho
-    for linha in linhas:
-        linha = linha.strip()
+    Atributos: lista_nos (todos os nós, em ordem), reduzido (MultigrafoOrientado só com os nós
+    mantidos e um arco por par ligado) e eliminados (lista de (x, entradas, saidas) em ordem de
+    eliminação, com os índices dos vizinhos e custos no momento da eliminação).
+    """
+    def __init__(self, grafo):
+        with medir("contrair_grafo", num_nos=len(grafo.nos)):
+            self.lista_nos = sorted(list(grafo.nos))
+            n = len(self.lista_nos)
+            no_para_indice = {no: i for i, no in enumerate(self.lista_nos)}
+            protegidos = grafo.obter_nos_servico()
+            protegidos.add(grafo.deposito)
+            
+            # Custo mínimo por par (sem laços, que nunca melhoram um caminho) nos dois sentidos
+            saida = [{} for _ in range(n)]
+            entrada = [{} for _ in range(n)]
+            for i, vizinhos in enumerate(grafo.obter_adjacencia_indexada(self.lista_nos)):
+                for j, custo in vizinhos:
+                    if j != i:
+                        saida[i][j] = custo
+                        entrada[j][i] = custo
+            
+            def num_vizinhos(x):
+                return len(saida[x].keys() | entrada[x].keys())
+            
+            # intermediario[(a, b)] = x quando a ligação a -> b é um atalho por x
+            self._intermediario = {}
+            self.eliminados = []
+            eliminado = [False] * n
+            contraivel = [no not in protegidos for no in self.lista_nos]
+            pendentes = [x for x in range(n) if contraivel[x] and num_vizinhos(x) <= 2]
+            while pendentes:
+                x = pendentes.pop()
+                # A eliminação de um vizinho nunca aumenta o número de vizinhos de um nó
+                if eliminado[x]:
+                    continue
+                entradas, saidas = entrada[x], saida[x]
+                for a in entradas:
+                    del saida[a][x]
+                for b in saidas:
+                    del entrada[b][x]
+                for a, custo_entrada in entradas.items():
+                    for b, custo_saida in saidas.items():
+                        custo = custo_entrada + custo_saida
+                        if a != b and custo < saida[a].get(b, float('inf')):
+                            saida[a][b] = custo
+                            entrada[b][a] = custo
+                            self._intermediario[(a, b)] = x
+                saida[x], entrada[x] = {}, {}
+                eliminado[x] = True
+                self.eliminados.append((x, entradas, saidas))
+                for v in entradas.keys() | saidas.keys():
+                    if contraivel[v] and not eliminado[v] and num_vizinhos(v) <= 2:
+                        pendentes.append(v)
+            
+            self._mantidos = [i for i in range(n) if not eliminado[i]]
+            self.reduzido = MultigrafoOrientado()
+            for i in self._mantidos:
+                self.reduzido.adicionar_no(self.lista_nos[i])
+            for i in self._mantidos:
+                for j, custo in saida[i].items():
+                    self.reduzido.adicionar_arco(self.lista_nos[i], self.lista_nos[j], custo)
+
+    def _ultimo_antes(self, a, b):
+        """Índice do último nó original antes de b no caminho representado pela ligação a -> b."""
+        intermediario = self._intermediario
+        while (a, b) in intermediario:
+            a = intermediario[(a, b)]
+        return a
+
+    def calcular_caminhos_minimos(self, motor="auto", processos=1):
+        """
+        Calcula os caminhos mínimos do grafo reduzido com o motor dado e retorna as matrizes
+        (dist, pred, lista_nos) de todos os nós do grafo original, no formato de
+        AlgoritmosGrafo.calcular_caminhos_minimos.
+        """
+        dist_reduzida, pred_reduzida, nos_reduzidos = self.reduzido.calcular_caminhos_minimos(motor=motor,
+                                                                                              processos=processos)
+        with medir("expandir_caminhos", nos_eliminados=len(self.eliminados)):
+            n = len(self.lista_nos)
+            infinito = float('inf')
+            dist = [[infinito] * n for _ in range(n)]
+            pred = [[-1] * n for _ in range(n)]
+            ultimo_antes = self._ultimo_antes
+            
+            # nos_reduzidos segue a ordem de lista_nos, como os índices de _mantidos
+            mantidos = self._mantidos
+            for r, i in enumerate(mantidos):
+                linha_dist, linha_pred = dist[i], pred[i]
+                for s, j in enumerate(mantidos):
+                    linha_dist[j] = dist_reduzida[r][s]
+                    p = pred_reduzida[r][s]
+                    if p != -1:
+                        linha_pred[j] = ultimo_antes(mantidos[p], j)
+            
+            conhecidos = list(mantidos)
+            for x, entradas, saidas in reversed(self.eliminados):
+                # Linha de x: sai por um vizinho b de saída e segue o caminho mínimo de b
+                linha_dist, linha_pred = dist[x], pred[x]
+                for b, custo in saidas.items():
+                    dist_b, pred_b = dist[b], pred[b]
+                    for j in conhecidos:
+                        d = custo + dist_b[j]
+                        if d < linha_dist[j]:
+                            linha_dist[j] = d
+                            linha_pred[j] = pred_b[j] if j != b else ultimo_antes(x, b)
+                # Coluna de x: chega por um vizinho a de entrada
+                for a, custo in entradas.items():
+                    anterior = ultimo_antes(a, x)
+                    for i in conhecidos:
+                        d = dist[i][a] + custo
+                        if d < dist[i][x]:
+                            dist[i][x] = d
+                            pred[i][x] = anterior
+                linha_dist[x] = 0
+                conhecidos.append(x)
         
-        if linha.startswith("Name:"):
-            grafo.nome = linha.split("\t")[1]
-        elif linha.startswith("Optimal value:"):
-            grafo.valor_otimo = float(linha.split("\t")[1])
-        elif linha.startswith("#Vehicles:"):
-            grafo.veiculos = int(linha.split("\t")[1])
-        elif linha.startswith("Capacity:"):
-            grafo.capacidade = int(linha.split("\t")[1])
-        elif linha.startswith("Depot Node:"):
-            grafo.deposito = int(linha.split("\t")[1])
-        
-        # Para após a seção do cabeçalho
-        if linha.startswith("ReN."):
-            break
-    
-    # Encontra seções no arquivo
-    indices_secao = {}
-    for i, linha in enumerate(linhas):
-        if linha.startswith("ReN."):
-            indices_secao["nos_requeridos"] = i
-        elif linha.startswith("ReE."):
-            indices_secao["arestas_requeridas"] = i
-        elif linha.startswith("EDGE"):
-            indices_secao["arestas_nao_requeridas"] = i
-        elif linha.startswith("ReA."):
-            indices_secao["arcos_requeridos"] = i
-        elif linha.startswith("ARC"):
-            indices_secao["arcos_nao_requeridos"] = i
-    
-    # Analisa nós requeridos
-    i = indices_secao["nos_requeridos"] + 1
-    while i < indices_secao["arestas_requeridas"]:
-        linha = linhas[i].strip()
-        if not linha or linha.startswith("#"):
-            i += 1
+        return dist, pred, self.lista_nos
+
+def resolver_motor_caminhos(motor, num_nos=0, num_pares=0):
+    """
+    Converte o nome de motor informado em "python", "numpy" ou "dijkstra". No modo "auto",
+    usa o número de nós e de pares adjacentes para decidir se o grafo é esparso.
+    """
+    if motor not in MOTORES_CAMINHOS:
+        raise ValueError(f"Motor de caminhos mínimos desconhecido: {motor!r}")
+    if motor == "auto":
+        if num_nos > 1 and num_pares * math.log2(num_nos) < FATOR_ESPARSIDADE * num_nos * num_nos:
+            return "dijkstra"
+        return "numpy" if np is not None else "python"
+    return motor
+
+def dijkstra_origem(adjacencia, origem):
+    """
+    Executa o algoritmo de Dijkstra (com heap binário) a partir do índice origem sobre uma lista
+    de adjacência indexada. Retorna as linhas de distâncias e de predecessores dessa origem.
+    """
+    n = len(adjacencia)
+    dist = [float('inf')] * n
+    pred = [-1] * n
+    dist[origem] = 0
+    
+    heap = [(0, origem)]
+    while heap:
+        d, i = heapq.heappop(heap)
+        if d > dist[i]:
+            continue  # Entrada obsoleta: o nó já foi fechado com distância menor
+        for j, custo in adjacencia[i]:
+            nova_dist = d + custo
+            if nova_dist < dist[j]:
+                dist[j] = nova_dist
+                pred[j] = i
+                heapq.heappush(heap, (nova_dist, j))
+    
+    return dist, pred
+
+def relaxar_reducao_custo(dist, pred, a, b, custo):
+    """
+    Atualiza no local matrizes exatas de distâncias e predecessores após o custo mínimo de a
+    para b (índices) cair para custo: cada par (i, j) passa a considerar i -> a -> b -> j.
+    Linhas em que a nova ligação não melhora nem a distância até b ficam inalteradas.
+    """
+    linha_b, pred_b = dist[b], pred[b]
+    for i in range(len(dist)):
+        linha_i = dist[i]
+        base = linha_i[a] + custo
+        if base >= linha_i[b]:
+            continue
+        pred_i = pred[i]
+        for j, dist_b_j in enumerate(linha_b):
+            nova_dist = base + dist_b_j
+            if nova_dist < linha_i[j]:
+                linha_i[j] = nova_dist
+                pred_i[j] = a if j == b else pred_b[j]
+
+def matrizes_numpy_para_listas(dist, pred):
+    """
+    Converte matrizes numpy de distâncias e predecessores para listas de listas no formato
+    usado por calcular_caminhos_minimos (float('inf') sem caminho, -1 sem predecessor).
+    """
+    finitos = dist[np.isfinite(dist)]
+    custos_inteiros = bool(np.all(finitos == np.floor(finitos)))
+    
+    lista_dist = dist.tolist()
+    if custos_inteiros:
+        # Mantém custos inteiros como int, como na implementação em Python puro
+        lista_dist = [[int(valor) if valor != math.inf else valor for valor in linha] for linha in lista_dist]
+    
+    return lista_dist, pred.tolist()
+
+def listas_para_matrizes_numpy(dist, pred):
+    """Converte matrizes em listas de listas para arrays numpy (float64 e int64)."""
+    return np.array(dist, dtype=np.float64), np.array(pred, dtype=np.int64)
+
+def dependencias_brandes(adjacencia, origem):
+    """
+    Etapa de uma origem do algoritmo de Brandes em grafos ponderados. Recebe uma lista de
+    adjacência com (j, custo, multiplicidade) e retorna a dependência de cada nó em relação à
+    origem, isto é, a soma, sobre os destinos, da fração de caminhos mínimos que passam pelo nó.
+    """
+    n = len(adjacencia)
+    dist = [float('inf')] * n
+    sigma = [0] * n  # Número de caminhos mínimos a partir da origem
+    predecessores = [[] for _ in range(n)]  # [(predecessor, multiplicidade)] em caminhos mínimos
+    fechado = [False] * n
+    ordem = []  # Nós em ordem não decrescente de distância
+    
+    dist[origem] = 0
+    sigma[origem] = 1
+    heap = [(0, origem)]
+    while heap:
+        d, v = heapq.heappop(heap)
+        if fechado[v]:
+            continue
+        fechado[v] = True
+        ordem.append(v)
+        for w, custo, multiplicidade in adjacencia[v]:
+            nova_dist = d + custo
+            if nova_dist < dist[w]:
+                dist[w] = nova_dist
+                sigma[w] = sigma[v] * multiplicidade
+                predecessores[w] = [(v, multiplicidade)]
+                heapq.heappush(heap, (nova_dist, w))
+            elif nova_dist == dist[w] and not fechado[w]:
+                sigma[w] += sigma[v] * multiplicidade
+                predecessores[w].append((v, multiplicidade))
+    
+    # Acumula as dependências dos nós mais distantes para os mais próximos
+    dependencia = [0.0] * n
+    for w in reversed(ordem):
+        coeficiente = (1 + dependencia[w]) / sigma[w]
+        for v, multiplicidade in predecessores[w]:
+            dependencia[v] += sigma[v] * multiplicidade * coeficiente
+    dependencia[origem] = 0.0
+    
+    return dependencia
+
+# Lista de adjacência compartilhada por cada processo trabalhador (enviada uma única vez, no inicializador)
+_adjacencia_trabalhador = None
+
+def _inicializar_trabalhador(adjacencia):
+    """Guarda a lista de adjacência no processo trabalhador."""
+    global _adjacencia_trabalhador
+    _adjacencia_trabalhador = adjacencia
+
+def _dijkstra_bloco(origens, tipo_distancia):
+    """
+    Executa Dijkstra para um bloco de origens no processo trabalhador. Cada linha volta como
+    arrays compactos; com custos inteiros, distâncias infinitas são codificadas como -1.
+    """
+    resultado = []
+    for origem in origens:
+        dist, pred = dijkstra_origem(_adjacencia_trabalhador, origem)
+        if tipo_distancia == 'q':
+            dist = [-1 if d == float('inf') else d for d in dist]
+        resultado.append((array(tipo_distancia, dist), array('q', pred)))
+    return resultado
+
+def calcular_linhas_dijkstra(adjacencia, origens, processos=1):
+    """
+    Calcula as linhas de distâncias e predecessores das origens dadas (índices na lista de
+    adjacência), opcionalmente distribuindo as origens entre um pool de processos.
+    """
+    origens = list(origens)
+    if processos <= 1 or len(origens) < 2:
+        linhas = [dijkstra_origem(adjacencia, origem) for origem in origens]
+        return [d for d, _ in linhas], [p for _, p in linhas]
+    
+    # Custos inteiros viajam como int64; os demais, como float64
+    custos_inteiros = all(isinstance(custo, int) for vizinhos in adjacencia for _, custo in vizinhos)
+    tipo_distancia = 'q' if custos_inteiros else 'd'
+    
+    # Divide as origens em blocos para amortizar a comunicação entre processos
+    tamanho_bloco = max(1, len(origens) // (processos * 4))
+    blocos = [origens[i:i + tamanho_bloco] for i in range(0, len(origens), tamanho_bloco)]
+    
+    dist, pred = [], []
+    with ProcessPoolExecutor(max_workers=processos, initializer=_inicializar_trabalhador,
+                             initargs=(adjacencia,)) as executor:
+        for bloco in executor.map(_dijkstra_bloco, blocos, [tipo_distancia] * len(blocos)):
+            for linha_dist, linha_pred in bloco:
+                if tipo_distancia == 'q':
+                    dist.append([float('inf') if d < 0 else d for d in linha_dist])
+                else:
+                    dist.append(linha_dist.tolist())
+                pred.append(linha_pred.tolist())
+    
+    return dist, pred
+
+# Campos do cabeçalho do arquivo .dat: {rótulo: (atributo do grafo, conversão)}
+CAMPOS_CABECALHO_DAT = {
+    "Name": ("nome", str),
+    "Optimal value": ("valor_otimo", float),
+    "#Vehicles": ("veiculos", int),
+    "Capacity": ("capacidade", int),
+    "Depot Node": ("deposito", int),
+}
+
+# Seções do arquivo .dat: {prefixo da linha de título: (tipo de registro, número mínimo de campos)}
+SECOES_DAT = {
+    "ReN.": ("no_requerido", 3),
+    "ReE.": ("aresta_requerida", 6),
+    "EDGE": ("aresta", 4),
+    "ReA.": ("arco_requerido", 6),
+    "ARC": ("arco", 4),
+}
+
+def abrir_instancia_dat(caminho_arquivo):
+    """
+    Abre um arquivo de instância em modo texto, descompactando-o em fluxo quando estiver em
+    gzip, xz ou bzip2 (o formato é reconhecido pelos bytes iniciais, não pela extensão).
+    """
+    with open(caminho_arquivo, 'rb') as arquivo:
+        inicio = arquivo.read(6)
+    
+    if inicio.startswith(b"\x1f\x8b"):
+        return gzip.open(caminho_arquivo, 'rt')
+    if inicio.startswith(b"\xfd7zXZ\x00"):
+        return lzma.open(caminho_arquivo, 'rt')
+    if inicio.startswith(b"BZh"):
+        return bz2.open(caminho_arquivo, 'rt')
+    return open(caminho_arquivo, 'r')
+
+def iterar_registros_dat(arquivo):
+    """
+    Lê um arquivo .dat linha a linha, em uma única passagem, e gera os registros encontrados
+    como tuplas (tipo, valores):
+    
+    - ("cabecalho", (atributo, valor)) para os campos de CAMPOS_CABECALHO_DAT;
+    - ("no_requerido", (no, demanda, custo_servico));
+    - ("aresta_requerida" | "arco_requerido", (u, v, custo, demanda, custo_servico));
+    - ("aresta" | "arco", (u, v, custo)).
+    
+    O estado atual é a última seção cujo título foi lido, de modo que seções ausentes ou fora
+    de ordem não interrompem a leitura. Linhas vazias, comentários e linhas com campos
+    insuficientes são ignoradas.
+    """
+    secao = None
+    for numero_linha, linha in enumerate(arquivo, 1):
+        if isinstance(linha, bytes):
+            linha = linha.decode()
+        linha = linha.strip()
+        if not linha:
             continue
         
-        partes = linha.split("\t")
-        if len(partes) >= 3:
-            id_no = int(partes[0][1:])  # Remove o prefixo 'N' e converte para int
-            demanda = int(partes[1])
-            custo_servico = int(partes[2])
-            grafo.adicionar_no(id_no, demanda, custo_servico, requerido=True)
-        i += 1
-    
-    # Analisa arestas requeridas
-    i = indices_secao["arestas_requeridas"] + 1
-    while i < indices_secao["arestas_nao_requeridas"]:
-        linha = linhas[i].strip()
-        if not linha or linha.startswith("#"):
-            i += 1
+        # Título de seção: muda o estado
+        titulo = next((prefixo for prefixo in SECOES_DAT if linha.startswith(prefixo)), None)
+        if titulo is not None:
+            secao = SECOES_DAT[titulo]
             continue
         
-        partes = linha.split("\t")
-        if len(partes) >= 6:
-            id_aresta = partes[0]
-            no_origem = int(partes[1])
-            no_destino = int(partes[2])
-            custo = int(partes[3])
-            demanda = int(partes[4])
-            custo_servico = int(partes[5])
-            grafo.adicionar_aresta(no_origem, no_destino, custo, demanda, custo_servico, requerido=True)
-        i += 1
-    
-    # Analisa arestas não requeridas
-    i = indices_secao["arestas_nao_requeridas"] + 1
-    while i < indices_secao["arcos_requeridos"]:
-        linha = linhas[i].strip()
-        if not linha or linha.startswith("#"):
-            i += 1
+        # Fora das seções, só interessam os campos de cabeçalho ("Rótulo: valor")
+        if secao is None:
+            rotulo, separador, valor = linha.partition(":")
+            if separador and rotulo.strip() in CAMPOS_CABECALHO_DAT:
+                atributo, conversao = CAMPOS_CABECALHO_DAT[rotulo.strip()]
+                yield "cabecalho", (atributo, conversao(valor.strip()))
             continue
         
-        partes = linha.split("\t")
-        if len(partes) >= 4:
-            id_aresta = partes[0]
-            no_origem = int(partes[1])
-            no_destino = int(partes[2])
-            custo = int(partes[3])
-            grafo.adicionar_aresta(no_origem, no_destino, custo, requerido=False)
-        i += 1
-    
-    # Analisa arcos requeridos
-    i = indices_secao["arcos_requeridos"] + 1
-    while i < indices_secao["arcos_nao_requeridos"]:
-        linha = linhas[i].strip()
-        if not linha or linha.startswith("#"):
-            i += 1
+        if linha.startswith("#"):
             continue
         
-        partes = linha.split("\t")
-        if len(partes) >= 6:
-            id_arco = partes[0]
-            no_origem = int(partes[1])
-            no_destino = int(partes[2])
-            custo = int(partes[3])
-            demanda = int(partes[4])
-            custo_servico = int(partes[5])
-            grafo.adicionar_arco(no_origem, no_destino, custo, demanda, custo_servico, requerido=True)
-        i += 1
-    
-    # Analisa arcos não requeridos
-    i = indices_secao["arcos_nao_requeridos"] + 1
-    while i < len(linhas):
-        linha = linhas[i].strip()
-        if not linha or linha.startswith("#"):
-            i += 1
+        tipo, minimo_campos = secao
+        partes = linha.split()
+        if len(partes) < minimo_campos:
             continue
         
-        partes = linha.split("\t")
-        if len(partes) >= 4:
-            id_arco = partes[0]
-            no_origem = int(partes[1])
-            no_destino = int(partes[2])
-            custo = int(partes[3])
-            grafo.adicionar_arco(no_origem, no_destino, custo, requerido=False)
-        i += 1
+        try:
+            if tipo == "no_requerido":
+                # Remove o prefixo 'N' do identificador do nó
+                yield tipo, (int(partes[0][1:]), int(partes[1]), int(partes[2]))
+            elif minimo_campos == 6:
+                yield tipo, tuple(int(parte) for parte in partes[1:6])
+            else:
+                yield tipo, tuple(int(parte) for parte in partes[1:4])
+        except ValueError as erro:
+            raise ValueError(f"Linha {numero_linha} inválida na seção {tipo!r}: {linha!r}") from erro
+
+def analisar_arquivo_dat(caminho_arquivo):
+    """
+    Analisa um arquivo .dat e retorna um objeto MultigrafoOrientado.
     
-    # Adiciona o nó depósito se ainda não estiver no grafo
-    if grafo.deposito and grafo.deposito not in grafo.nos:
-        grafo.adicionar_no(grafo.deposito)
+    Aceita um caminho (texto puro ou compactado com gzip/xz/bzip2) ou um objeto de arquivo já
+    aberto; os registros são lidos em fluxo e inseridos diretamente no grafo.
+    """
+    with medir("analisar_arquivo_dat", arquivo=str(getattr(caminho_arquivo, "name", caminho_arquivo))):
+        if hasattr(caminho_arquivo, "read"):
+            with medir("construir_grafo_dat"):
+                grafo = _construir_grafo_dat(caminho_arquivo)
+        else:
+            with medir("abrir_instancia_dat"):
+                arquivo = abrir_instancia_dat(caminho_arquivo)
+            with arquivo, medir("construir_grafo_dat"):
+                grafo = _construir_grafo_dat(arquivo)
+    
+        # Adiciona o nó depósito se ainda não estiver no grafo
+        if grafo.deposito and grafo.deposito not in grafo.nos:
+            grafo.adicionar_no(grafo.deposito)
+    
+        return grafo
+
+def _construir_grafo_dat(arquivo):
+    """Monta um MultigrafoOrientado a partir dos registros de iterar_registros_dat."""
+    grafo = MultigrafoOrientado()
+    
+    for tipo, valores in iterar_registros_dat(arquivo):
+        if tipo == "cabecalho":
+            atributo, valor = valores
+            setattr(grafo, atributo, valor)
+        elif tipo == "no_requerido":
+            no, demanda, custo_servico = valores
+            grafo.adicionar_no(no, demanda, custo_servico, requerido=True)
+        elif tipo == "aresta_requerida":
+            u, v, custo, demanda, custo_servico = valores
+            grafo.adicionar_aresta(u, v, custo, demanda, custo_servico, requerido=True)
+        elif tipo == "aresta":
+            u, v, custo = valores
+            grafo.adicionar_aresta(u, v, custo, requerido=False)
+        elif tipo == "arco_requerido":
+            u, v, custo, demanda, custo_servico = valores
+            grafo.adicionar_arco(u, v, custo, demanda, custo_servico, requerido=True)
+        elif tipo == "arco":
+            u, v, custo = valores
+            grafo.adicionar_arco(u, v, custo, requerido=False)
     
     return grafo
 
-def exportar_estatisticas(grafo, arquivo_saida):
+def exportar_estatisticas(grafo, arquivo_saida, opcoes_intermediacao=None, metricas=None):
+    """
+    Exporta as estatísticas do grafo para um arquivo JSON. Com metricas, calcula e exporta
+    apenas os campos indicados (veja calcular_estatisticas).
+    """
+    with medir("exportar_estatisticas", arquivo=arquivo_saida):
+        estatisticas = grafo.calcular_estatisticas(opcoes_intermediacao, metricas)
+        gravar_estatisticas(estatisticas, arquivo_saida)
+        return estatisticas
+
+def gravar_estatisticas(estatisticas, arquivo_saida):
+    """Grava um dicionário de estatísticas já calculado em um arquivo JSON (gzip se terminar em ".gz")."""
+    with medir("gravar_estatisticas", arquivo=arquivo_saida):
+        with abrir_saida_texto(arquivo_saida) as arquivo:
+            json.dump(_estatisticas_serializaveis(estatisticas), arquivo, indent=4)
+
+def _estatisticas_serializaveis(estatisticas):
+    """Retorna um dicionário com os conjuntos convertidos para listas, para serialização JSON."""
+    return {chave: list(valor) if isinstance(valor, set) else valor for chave, valor in estatisticas.items()}
+
+def abrir_saida_texto(arquivo_saida, compactar=None):
+    """
+    Abre um arquivo de saída em modo texto, compactado com gzip quando compactar=True ou, com
+    compactar=None, quando o nome termina em ".gz".
+    """
+    if compactar is None:
+        compactar = arquivo_saida.endswith(".gz")
+    if compactar:
+        return gzip.open(arquivo_saida, 'wt')
+    return open(arquivo_saida, 'w')
+
+def _linha_distancias_json(linha):
+    """Linha de distâncias serializável em JSON ("inf" quando não há caminho)."""
+    return [d if d != float('inf') else "inf" for d in linha]
+
+def _linha_predecessores_json(linha, lista_nos):
+    """Linha de predecessores com os nós (None quando não há predecessor) em vez de índices."""
+    return [lista_nos[p] if p != -1 else None for p in linha]
+
+def exportar_caminhos_minimos(grafo, arquivo_saida, compactar=None):
+    """
+    Exporta a matriz de caminhos mínimos e a matriz de predecessores para um arquivo JSON
+    no formato {"distancias": {u: {v: d}}, "predecessores": {u: {v: p}}}, com "inf" quando
+    não há caminho e null quando não há predecessor.
+    
+    O arquivo é escrito em fluxo, uma linha da matriz por vez e sem indentação, de modo que a
+    memória extra é O(n). Com compactar=True (ou nome terminado em ".gz"), grava em gzip.
+    Retorna um resumo com a ordem dos nós e o arquivo gravado.
+    """
+    with medir("exportar_caminhos_minimos", arquivo=arquivo_saida):
+        dist, pred, lista_nos = grafo.calcular_caminhos_minimos()
+        # Chaves de objeto JSON são sempre texto
+        chaves = [str(no) for no in lista_nos]
+        
+        matrizes = (
+            ("distancias", lambda i: _linha_distancias_json(dist[i])),
+            ("predecessores", lambda i: _linha_predecessores_json(pred[i], lista_nos)),
+        )
+        
+        with abrir_saida_texto(arquivo_saida, compactar) as arquivo:
+            separador_matriz = "{"
+            for nome_matriz, converter_linha in matrizes:
+                arquivo.write(f'{separador_matriz}"{nome_matriz}":{{')
+                separador_matriz = ","
+                for i, chave in enumerate(chaves):
+                    if i:
+                        arquivo.write(",")
+                    arquivo.write(json.dumps(chave) + ":")
+                    arquivo.write(json.dumps(dict(zip(chaves, converter_linha(i))), separators=(",", ":")))
+                arquivo.write("}")
+            arquivo.write("}")
+        
+        return {"formato": "caminhos_minimos_json", "nos": lista_nos, "arquivo": arquivo_saida}
+
+def exportar_caminhos_minimos_ndjson(grafo, arquivo_saida, linhas_por_bloco=64, compactar=None):
     """
-    Exporta as estatísticas do grafo para um arquivo JSON.
+    Exporta as matrizes de caminhos mínimos em JSON delimitado por linhas (NDJSON), para leitura
+    em fluxo. A primeira linha é o cabeçalho {"formato", "versao", "linhas_por_bloco", "nos"};
+    cada linha seguinte
+    traz um bloco de até linhas_por_bloco origens consecutivas:
+    
+        {"origens": [u, ...], "distancias": [[...], ...], "predecessores": [[...], ...]}
+    
+    com as colunas na ordem de "nos", "inf" quando não há caminho e null quando não há
+    predecessor. Com compactar=True (ou nome terminado em ".gz"), grava em gzip.
+    Retorna o dicionário do cabeçalho.
     """
-    estatisticas = grafo.calcular_estatisticas()
+    with medir("exportar_caminhos_minimos_ndjson", arquivo=arquivo_saida):
+        dist, pred, lista_nos = grafo.calcular_caminhos_minimos()
+        cabecalho = {"formato": "caminhos_minimos_ndjson", "versao": 1, "linhas_por_bloco": linhas_por_bloco,
+                     "nos": lista_nos}
+        
+        with abrir_saida_texto(arquivo_saida, compactar) as arquivo:
+            arquivo.write(json.dumps(cabecalho, separators=(",", ":")) + "\n")
+            for inicio in range(0, len(lista_nos), linhas_por_bloco):
+                bloco = {"origens": lista_nos[inicio:inicio + linhas_por_bloco], "distancias": [], "predecessores": []}
+                for i in range(inicio, min(inicio + linhas_por_bloco, len(lista_nos))):
+                    bloco["distancias"].append(_linha_distancias_json(dist[i]))
+                    bloco["predecessores"].append(_linha_predecessores_json(pred[i], lista_nos))
+                arquivo.write(json.dumps(bloco, separators=(",", ":")) + "\n")
+        
+        return cabecalho
+
+def iterar_caminhos_minimos_ndjson(arquivo_entrada, origens=None):
+    """
+    Lê em fluxo um arquivo de exportar_caminhos_minimos_ndjson (compactado ou não) e gera, para
+    cada origem, a tupla (origem, linha_distancias, linha_predecessores, nos), com inf quando não
+    há caminho, None quando não há predecessor e as colunas na ordem da lista nos.
     
-    # Converte conjuntos para listas para serialização JSON
-    for chave, valor in estatisticas.items():
-        if isinstance(valor, set):
-            estatisticas[chave] = list(valor)
+    Com origens (coleção de nós), gera apenas essas linhas: os blocos que não as contêm são
+    pulados sem decodificação e a leitura termina no último bloco necessário.
+    """
+    # abrir_instancia_dat reconhece a compactação pelos bytes iniciais
+    with abrir_instancia_dat(arquivo_entrada) as arquivo:
+        cabecalho = json.loads(arquivo.readline())
+        nos = cabecalho["nos"]
+        blocos = None
+        if origens is not None:
+            origens = set(origens)
+            no_para_indice = {no: i for i, no in enumerate(nos)}
+            linhas_por_bloco = cabecalho.get("linhas_por_bloco")
+            if linhas_por_bloco:
+                blocos = {no_para_indice[no] // linhas_por_bloco for no in origens if no in no_para_indice}
+                if not blocos:
+                    return
+        
+        numero_bloco = -1
+        for linha in arquivo:
+            if not linha.strip():
+                continue
+            numero_bloco += 1
+            if blocos is not None:
+                if numero_bloco not in blocos:
+                    continue
+                blocos.discard(numero_bloco)
+            bloco = json.loads(linha)
+            for origem, linha_dist, linha_pred in zip(bloco["origens"], bloco["distancias"], bloco["predecessores"]):
+                if origens is not None and origem not in origens:
+                    continue
+                linha_dist = [float('inf') if d == "inf" else d for d in linha_dist]
+                yield origem, linha_dist, linha_pred, nos
+            if blocos is not None and not blocos:
+                return
+
+def iterar_caminhos_minimos_json(arquivo_entrada, matriz="distancias", origens=None, tamanho_bloco=1 << 20):
+    """
+    Lê em fluxo uma das matrizes ("distancias" ou "predecessores") de um arquivo de
+    exportar_caminhos_minimos (compactado ou não, com ou sem indentação) e gera (origem, linha),
+    com a origem como texto (chave do JSON) e a linha como {destino (texto): valor}.
     
-    with open(arquivo_saida, 'w') as arquivo:
-        json.dump(estatisticas, arquivo, indent=4)
+    O arquivo é lido em blocos de tamanho_bloco caracteres. Com origens (coleção de chaves), só
+    essas linhas são decodificadas; as demais são puladas até o seu "}" sem análise, e a leitura
+    termina assim que todas forem encontradas.
+    """
+    pendentes = None if origens is None else {str(origem) for origem in origens}
     
-    return estatisticas
+    # abrir_instancia_dat reconhece a compactação pelos bytes iniciais
+    with abrir_instancia_dat(arquivo_entrada) as arquivo:
+        texto = ""
+        posicao = 0
+        
+        def ler_mais():
+            nonlocal texto, posicao
+            bloco = arquivo.read(tamanho_bloco)
+            if not bloco:
+                raise ValueError(f"Fim inesperado do arquivo de caminhos mínimos {arquivo_entrada!r}.")
+            texto = texto[posicao:] + bloco
+            posicao = 0
+        
+        def proximo_caractere():
+            # Pula espaços e retorna o próximo caractere significativo (sem consumi-lo)
+            nonlocal posicao
+            while True:
+                while posicao < len(texto) and texto[posicao] in " \t\r\n":
+                    posicao += 1
+                if posicao < len(texto):
+                    return texto[posicao]
+                ler_mais()
+        
+        def encontrar(caractere, deslocamento=0):
+            # Índice da próxima ocorrência a partir de posicao + deslocamento, lendo mais se preciso
+            while True:
+                indice = texto.find(caractere, posicao + deslocamento)
+                if indice != -1:
+                    return indice
+                ler_mais()
+        
+        def consumir(esperado):
+            nonlocal posicao
+            caractere = proximo_caractere()
+            if caractere != esperado:
+                raise ValueError(f"Esperado {esperado!r} em {arquivo_entrada!r}, encontrado {caractere!r}.")
+            posicao += 1
+        
+        def ler_chave():
+            # As chaves dos arquivos exportados (nós e nomes de matriz) não contêm aspas escapadas
+            nonlocal posicao
+            if proximo_caractere() != '"':
+                raise ValueError(f"Chave esperada em {arquivo_entrada!r}, encontrado {texto[posicao]!r}.")
+            fim = encontrar('"', 1)
+            chave = json.loads(texto[posicao:fim + 1])
+            posicao = fim + 1
+            consumir(":")
+            return chave
+        
+        consumir("{")
+        while proximo_caractere() != "}":
+            if proximo_caractere() == ",":
+                posicao += 1
+            nome_matriz = ler_chave()
+            consumir("{")
+            while proximo_caractere() != "}":
+                if proximo_caractere() == ",":
+                    posicao += 1
+                origem = ler_chave()
+                if proximo_caractere() != "{":
+                    raise ValueError(f"Linha {origem!r} inválida em {arquivo_entrada!r}.")
+                # As linhas são objetos planos: terminam no primeiro "}"
+                fim = encontrar("}")
+                if nome_matriz == matriz and (pendentes is None or origem in pendentes):
+                    yield origem, json.loads(texto[posicao:fim + 1])
+                    if pendentes is not None:
+                        pendentes.discard(origem)
+                        if not pendentes:
+                            return
+                posicao = fim + 1
+            posicao += 1
+            if nome_matriz == matriz:
+                return
 
-def exportar_caminhos_minimos(grafo, arquivo_saida):
+def carregar_caminhos_minimos_ndjson(arquivo_entrada):
+    """Lê um arquivo de exportar_caminhos_minimos_ndjson e retorna um MatrizCaminhosMemoria."""
+    dist = []
+    pred = []
+    nos = []
+    no_para_indice = None
+    for _, linha_dist, linha_pred, nos in iterar_caminhos_minimos_ndjson(arquivo_entrada):
+        if no_para_indice is None:
+            no_para_indice = {no: i for i, no in enumerate(nos)}
+        dist.append(linha_dist)
+        pred.append([no_para_indice[p] if p is not None else -1 for p in linha_pred])
+    return MatrizCaminhosMemoria(dist, pred, nos)
+
+def exportar_matriz_servicos(grafo, arquivo_saida):
     """
-    Exporta a matriz de caminhos mínimos e a matriz de predecessores para um arquivo JSON.
+    Exporta para um arquivo JSON as tarefas de serviço e a matriz de custos entre elas
+    (veja MultigrafoOrientado.calcular_matriz_servicos), com "inf" quando não há caminho.
     """
-    dist, pred, lista_nos = grafo.calcular_caminhos_minimos()
+    with medir("exportar_matriz_servicos", arquivo=arquivo_saida):
+        resultado = grafo.calcular_matriz_servicos()
+        custos = [[custo if custo != float('inf') else "inf" for custo in linha] for linha in resultado["custos"]]
     
-    # Converte matrizes para dicionários para melhor legibilidade
-    dict_dist = {}
-    dict_pred = {}
+        with open(arquivo_saida, 'w') as arquivo:
+            json.dump({"tarefas": resultado["tarefas"], "custos": custos}, arquivo)
     
-    for i, u in enumerate(lista_nos):
-        dict_dist[u] = {}
-        dict_pred[u] = {}
-        for j, v in enumerate(lista_nos):
-            dict_dist[u][v] = dist[i][j] if dist[i][j] != float('inf') else "inf"
-            dict_pred[u][v] = lista_nos[pred[i][j]] if pred[i][j] != -1 else None
+        return resultado
+
+# Sufixos dos arquivos gerados por exportar_caminhos_minimos_binario
+SUFIXO_CABECALHO_BINARIO = ".nos.json"
+SUFIXO_DISTANCIAS_BINARIO = ".dist.npy"
+SUFIXO_PREDECESSORES_BINARIO = ".pred.npy"
+
+def _cabecalho_npy(descricao, forma):
+    """Monta o cabeçalho do formato .npy (versão 1.0) para uma matriz em ordem C."""
+    texto = f"{{'descr': '{descricao}', 'fortran_order': False, 'shape': {forma}, }}"
+    # Magia (6) + versão (2) + tamanho (2) + texto + '\n' deve ser múltiplo de 64 bytes
+    preenchimento = (64 - (10 + len(texto) + 1) % 64) % 64
+    texto = texto + " " * preenchimento + "\n"
+    return b"\x93NUMPY\x01\x00" + struct.pack("<H", len(texto)) + texto.encode("latin1")
+
+def _ler_cabecalho_npy(dados):
+    """Retorna (descricao, forma, deslocamento dos dados) de um arquivo .npy versão 1.0."""
+    if dados[:6] != b"\x93NUMPY":
+        raise ValueError("Arquivo não está no formato .npy.")
+    tamanho = struct.unpack("<H", dados[8:10])[0]
+    cabecalho = bytes(dados[10:10 + tamanho]).decode("latin1")
+    descricao = cabecalho.split("'descr':")[1].split("'")[1]
+    forma = cabecalho.split("'shape':")[1].split("(")[1].split(")")[0]
+    forma = tuple(int(dimensao) for dimensao in forma.split(",") if dimensao.strip())
+    return descricao, forma, 10 + tamanho
+
+def _escrever_linha_binaria(arquivo, tipo, valores):
+    """Escreve uma linha de matriz como array little-endian do tipo dado."""
+    linha = array(tipo, valores)
+    if sys.byteorder != "little":
+        linha.byteswap()
+    linha.tofile(arquivo)
+
+def exportar_caminhos_minimos_binario(grafo, prefixo_saida):
+    """
+    Exporta as matrizes de distâncias e de predecessores em formato binário, linha a linha:
+
+    - <prefixo>.dist.npy: float64 little-endian (inf quando não há caminho);
+    - <prefixo>.pred.npy: int32 little-endian com o índice do predecessor (-1 quando não há);
+    - <prefixo>.nos.json: cabeçalho com a ordem dos nós e os nomes dos arquivos de matriz.
+
+    Os arquivos .npy podem ser abertos com numpy.load(..., mmap_mode='r') ou com
+    MatrizCaminhosBinaria, que consulta as matrizes por mmap sem carregá-las.
+    Retorna o dicionário do cabeçalho.
+    """
+    with medir("exportar_caminhos_minimos_binario", prefixo=prefixo_saida):
+        dist, pred, lista_nos = grafo.calcular_caminhos_minimos()
+        n = len(lista_nos)
+        base = os.path.basename(prefixo_saida)
+
+        with open(prefixo_saida + SUFIXO_DISTANCIAS_BINARIO, 'wb') as arquivo:
+            arquivo.write(_cabecalho_npy("<f8", (n, n)))
+            for linha in dist:
+                _escrever_linha_binaria(arquivo, 'd', linha)
+
+        with open(prefixo_saida + SUFIXO_PREDECESSORES_BINARIO, 'wb') as arquivo:
+            arquivo.write(_cabecalho_npy("<i4", (n, n)))
+            for linha in pred:
+                _escrever_linha_binaria(arquivo, 'i', linha)
+
+        cabecalho = {
+            "formato": "caminhos_minimos_binario",
+            "versao": 1,
+            "nos": lista_nos,
+            "distancias": base + SUFIXO_DISTANCIAS_BINARIO,
+            "predecessores": base + SUFIXO_PREDECESSORES_BINARIO,
+        }
+        with open(prefixo_saida + SUFIXO_CABECALHO_BINARIO, 'w') as arquivo:
+            json.dump(cabecalho, arquivo)
+
+        return cabecalho
+
+class MatrizCaminhosBinaria:
+    """
+    Leitura por mmap das matrizes gravadas por exportar_caminhos_minimos_binario. Apenas as
+    páginas consultadas são lidas do disco: distancia e predecessor custam O(1) e caminho
+    custa O(tamanho do caminho), independentemente do tamanho dos arquivos.
+    """
+    def __init__(self, prefixo):
+        with open(prefixo + SUFIXO_CABECALHO_BINARIO, 'r') as arquivo:
+            self.cabecalho = json.load(arquivo)
+        diretorio = os.path.dirname(prefixo)
+        self.lista_nos = self.cabecalho["nos"]
+        self.no_para_indice = {no: i for i, no in enumerate(self.lista_nos)}
+        self.n = len(self.lista_nos)
+        self._arquivos = []
+        self.dist = self._mapear(os.path.join(diretorio, self.cabecalho["distancias"]), 'd')
+        self.pred = self._mapear(os.path.join(diretorio, self.cabecalho["predecessores"]), 'i')
+
+    def _mapear(self, caminho, tipo):
+        """Mapeia um arquivo .npy na memória e retorna uma visão plana dos seus valores."""
+        arquivo = open(caminho, 'rb')
+        mapa = mmap.mmap(arquivo.fileno(), 0, access=mmap.ACCESS_READ)
+        self._arquivos.append((arquivo, mapa))
+        _, forma, deslocamento = _ler_cabecalho_npy(mapa)
+        if forma != (self.n, self.n):
+            raise ValueError(f"Dimensões {forma} de {caminho} não correspondem aos {self.n} nós do cabeçalho.")
+        if sys.byteorder != "little":
+            # Em máquinas big-endian, decodifica cada valor explicitamente
+            return _VisaoLittleEndian(mapa, deslocamento, "<" + tipo)
+        return memoryview(mapa)[deslocamento:].cast(tipo)
+
+    def fechar(self):
+        """Libera os mapeamentos de memória e fecha os arquivos."""
+        if isinstance(self.dist, memoryview):
+            self.dist.release()
+            self.pred.release()
+        self.dist = self.pred = None
+        for arquivo, mapa in self._arquivos:
+            mapa.close()
+            arquivo.close()
+        self._arquivos = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.fechar()
+
+    def calcular_caminhos_minimos(self):
+        """
+        Retorna (dist, pred, lista_nos) como listas, no formato de
+        MultigrafoOrientado.calcular_caminhos_minimos, para que os exportadores aceitem esta classe.
+        """
+        n = self.n
+        # Distâncias inteiras voltam como int, como no cálculo original
+        dist = [[int(d) if d.is_integer() else d for d in self.dist[i * n:(i + 1) * n]] for i in range(n)]
+        pred = [list(self.pred[i * n:(i + 1) * n]) for i in range(n)]
+        return dist, pred, self.lista_nos
+
+    def distancia(self, u, v):
+        """Distância mínima de u para v (inf quando não há caminho)."""
+        return self.dist[self.no_para_indice[u] * self.n + self.no_para_indice[v]]
+
+    def predecessor(self, u, v):
+        """Predecessor de v no caminho mínimo a partir de u (None quando não há)."""
+        indice = self.pred[self.no_para_indice[u] * self.n + self.no_para_indice[v]]
+        return self.lista_nos[indice] if indice != -1 else None
+
+    def caminho(self, u, v):
+        """Reconstrói o caminho mínimo de u para v como lista de nós ([] quando não há caminho)."""
+        i, j = self.no_para_indice[u], self.no_para_indice[v]
+        if i == j:
+            return [u]
+
+        caminho = [j]
+        while j != i:
+            j = self.pred[i * self.n + j]
+            if j == -1 or len(caminho) > self.n:
+                return []
+            caminho.append(j)
+        return [self.lista_nos[k] for k in reversed(caminho)]
+
+class _VisaoLittleEndian:
+    """Acesso indexado a valores little-endian de um mmap, usado em máquinas big-endian."""
+    def __init__(self, mapa, deslocamento, formato):
+        self.mapa = mapa
+        self.deslocamento = deslocamento
+        self.formato = formato
+        self.tamanho = struct.calcsize(formato)
+
+    def __len__(self):
+        return (len(self.mapa) - self.deslocamento) // self.tamanho
+
+    def __getitem__(self, indice):
+        if isinstance(indice, slice):
+            return [self[i] for i in range(*indice.indices(len(self)))]
+        return struct.unpack_from(self.formato, self.mapa, self.deslocamento + indice * self.tamanho)[0]
+
+class MatrizCaminhosMemoria:
+    """
+    Matrizes de caminhos mínimos em memória (listas de linhas), com a mesma interface de
+    consulta de MatrizCaminhosBinaria. Aceita o resultado de calcular_caminhos_minimos ou o
+    conteúdo de um arquivo de exportar_caminhos_minimos (veja carregar_caminhos_minimos_json).
+    """
+    def __init__(self, dist, pred, lista_nos):
+        self.dist = dist
+        self.pred = pred
+        self.lista_nos = list(lista_nos)
+        self.no_para_indice = {no: i for i, no in enumerate(self.lista_nos)}
+        self.n = len(self.lista_nos)
+
+    def fechar(self):
+        """Mantida por compatibilidade com MatrizCaminhosBinaria; não há recursos a liberar."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.fechar()
+
+    def calcular_caminhos_minimos(self):
+        """Retorna (dist, pred, lista_nos), para que os exportadores aceitem esta classe."""
+        return self.dist, self.pred, self.lista_nos
+
+    def distancia(self, u, v):
+        """Distância mínima de u para v (inf quando não há caminho)."""
+        return self.dist[self.no_para_indice[u]][self.no_para_indice[v]]
+
+    def predecessor(self, u, v):
+        """Predecessor de v no caminho mínimo a partir de u (None quando não há)."""
+        indice = self.pred[self.no_para_indice[u]][self.no_para_indice[v]]
+        return self.lista_nos[indice] if indice != -1 else None
+
+    def caminho(self, u, v):
+        """Reconstrói o caminho mínimo de u para v como lista de nós ([] quando não há caminho)."""
+        i, j = self.no_para_indice[u], self.no_para_indice[v]
+        if i == j:
+            return [u]
+
+        linha = self.pred[i]
+        caminho = [j]
+        while j != i:
+            j = linha[j]
+            if j == -1 or len(caminho) > self.n:
+                return []
+            caminho.append(j)
+        return [self.lista_nos[k] for k in reversed(caminho)]
+
+def carregar_caminhos_minimos_json(arquivo_entrada):
+    """
+    Lê um arquivo gravado por exportar_caminhos_minimos (compactado ou não) e retorna um
+    MatrizCaminhosMemoria. As chaves do JSON (sempre texto) voltam a ser nós inteiros quando
+    possível.
+    """
+    # abrir_instancia_dat reconhece a compactação pelos bytes iniciais
+    with abrir_instancia_dat(arquivo_entrada) as arquivo:
+        conteudo = json.load(arquivo)
     
-    resultado = {
-        "distancias": dict_dist,
-        "predecessores": dict_pred
-    }
+    distancias = conteudo["distancias"]
+    predecessores = conteudo["predecessores"]
+    chaves = list(distancias)
+    lista_nos = [int(chave) if chave.lstrip("-").isdigit() else chave for chave in chaves]
+    no_para_indice = {no: i for i, no in enumerate(lista_nos)}
     
-    with open(arquivo_saida, 'w') as arquivo:
-        json.dump(resultado, arquivo, indent=4)
+    dist = []
+    pred = []
+    for chave in chaves:
+        linha_dist = distancias[chave]
+        linha_pred = predecessores[chave]
+        dist.append([float('inf') if linha_dist[destino] == "inf" else linha_dist[destino] for destino in chaves])
+        pred.append([no_para_indice[linha_pred[destino]] if linha_pred[destino] is not None else -1
+                     for destino in chaves])
+    return MatrizCaminhosMemoria(dist, pred, lista_nos)
+
+# Versão dos algoritmos de análise. Faz parte da chave do cache de resultados: altere-a sempre
+# que uma mudança no código alterar as estatísticas ou as matrizes produzidas.
+VERSAO_ALGORITMOS = "3"
+
+# Tamanho máximo padrão do cache de resultados em disco (bytes)
+TAMANHO_MAXIMO_CACHE = 1024 * 1024 * 1024
+
+def calcular_hash_instancia(caminho_arquivo):
+    """Calcula o SHA-256 do conteúdo de um arquivo de instância, lido em blocos."""
+    resumo = hashlib.sha256()
+    with open(caminho_arquivo, 'rb') as arquivo:
+        for bloco in iter(lambda: arquivo.read(1 << 20), b""):
+            resumo.update(bloco)
+    return resumo.hexdigest()
+
+class CacheResultados:
+    """
+    Cache em disco dos resultados de analisar_arquivo_dat + calcular_estatisticas +
+    calcular_caminhos_minimos, indexado pelo hash do conteúdo da instância, pela versão dos
+    algoritmos e pelas opções de cálculo.
     
-    return resultado
+    Cada entrada é um diretório com as estatísticas em JSON compacto e, se tiverem sido
+    calculadas, as matrizes no formato de exportar_caminhos_minimos_binario. Quando o tamanho total passa de tamanho_maximo, as
+    entradas acessadas há mais tempo são removidas (LRU pela data de último acesso).
+    """
+    ARQUIVO_ESTATISTICAS = "estatisticas.json"
+    PREFIXO_CAMINHOS = "caminhos"
+    ARQUIVO_ACESSO = "ultimo_acesso"
+
+    def __init__(self, diretorio, tamanho_maximo=TAMANHO_MAXIMO_CACHE):
+        self.diretorio = diretorio
+        self.tamanho_maximo = tamanho_maximo
+        os.makedirs(diretorio, exist_ok=True)
+
+    def chave(self, caminho_arquivo, opcoes=None, hash_instancia=None):
+        """
+        Chave da instância: hash do conteúdo, versão dos algoritmos e opções de cálculo. Se o
+        hash do conteúdo (calcular_hash_instancia) já for conhecido, o arquivo não é relido.
+        """
+        resumo = hashlib.sha256()
+        resumo.update((hash_instancia or calcular_hash_instancia(caminho_arquivo)).encode())
+        resumo.update(VERSAO_ALGORITMOS.encode())
+        resumo.update(json.dumps(opcoes or {}, sort_keys=True).encode())
+        return resumo.hexdigest()
+
+    def chave_analise(self, caminho_arquivo, opcoes_intermediacao=None, metricas=None, hash_instancia=None):
+        """Chave usada por analisar_com_cache para a instância e as opções de estatísticas dadas."""
+        opcoes = dict(opcoes_intermediacao or {})
+        if metricas is not None:
+            opcoes["metricas"] = sorted(metricas)
+        return self.chave(caminho_arquivo, opcoes, hash_instancia)
+
+    def _diretorio_entrada(self, chave):
+        return os.path.join(self.diretorio, chave)
+
+    def prefixo_caminhos(self, chave):
+        """Prefixo das matrizes binárias de uma entrada (para MatrizCaminhosBinaria ou cópia)."""
+        return os.path.join(self._diretorio_entrada(chave), self.PREFIXO_CAMINHOS)
+
+    def tem_caminhos(self, chave):
+        """Indica se a entrada guardada sob a chave inclui as matrizes de caminhos mínimos."""
+        return os.path.isfile(self.prefixo_caminhos(chave) + SUFIXO_CABECALHO_BINARIO)
+
+    def obter(self, chave, caminhos=False):
+        """
+        Retorna (estatisticas, matrizes) de uma entrada guardada, ou None se ela não existir.
+        matrizes é uma MatrizCaminhosBinaria, ou None se a entrada foi guardada sem as matrizes;
+        com caminhos=True, uma entrada sem matrizes conta como inexistente. A consulta atualiza
+        a data de último acesso da entrada.
+        """
+        diretorio = self._diretorio_entrada(chave)
+        arquivo_estatisticas = os.path.join(diretorio, self.ARQUIVO_ESTATISTICAS)
+        if not os.path.isfile(arquivo_estatisticas):
+            return None
+        tem_caminhos = self.tem_caminhos(chave)
+        if caminhos and not tem_caminhos:
+            return None
+        
+        with open(arquivo_estatisticas, 'r') as arquivo:
+            estatisticas = json.load(arquivo)
+        self._registrar_acesso(diretorio)
+        return estatisticas, MatrizCaminhosBinaria(self.prefixo_caminhos(chave)) if tem_caminhos else None
+
+    def guardar(self, chave, grafo, estatisticas, caminhos=True):
+        """
+        Grava as estatísticas sob a chave dada e, com caminhos=True, também as matrizes de
+        caminhos mínimos do grafo. Uma entrada existente só é substituída se esta trouxer as
+        matrizes que faltam nela.
+        """
+        diretorio = self._diretorio_entrada(chave)
+        temporario = f"{diretorio}.tmp-{os.getpid()}"
+        os.makedirs(temporario, exist_ok=True)
+        
+        with open(os.path.join(temporario, self.ARQUIVO_ESTATISTICAS), 'w') as arquivo:
+            json.dump(_estatisticas_serializaveis(estatisticas), arquivo, separators=(",", ":"))
+        if caminhos:
+            exportar_caminhos_minimos_binario(grafo, os.path.join(temporario, self.PREFIXO_CAMINHOS))
+        self._registrar_acesso(temporario)
+        
+        # Publica a entrada de uma vez; se outro processo já a gravou, mantém a existente
+        try:
+            os.replace(temporario, diretorio)
+        except OSError:
+            if caminhos and not self.tem_caminhos(chave):
+                shutil.rmtree(diretorio, ignore_errors=True)
+                try:
+                    os.replace(temporario, diretorio)
+                except OSError:
+                    shutil.rmtree(temporario, ignore_errors=True)
+            else:
+                shutil.rmtree(temporario, ignore_errors=True)
+        
+        self._remover_excedente(preservar=chave)
+
+    def _registrar_acesso(self, diretorio):
+        with open(os.path.join(diretorio, self.ARQUIVO_ACESSO), 'w') as arquivo:
+            arquivo.write(str(time.time()))
+
+    def _remover_excedente(self, preservar=None):
+        """Remove as entradas menos recentemente usadas até o cache caber em tamanho_maximo."""
+        entradas = []
+        tamanho_total = 0
+        for nome in os.listdir(self.diretorio):
+            diretorio = os.path.join(self.diretorio, nome)
+            if not os.path.isdir(diretorio) or ".tmp-" in nome:
+                continue
+            tamanho = sum(entrada.stat().st_size for entrada in os.scandir(diretorio) if entrada.is_file())
+            arquivo_acesso = os.path.join(diretorio, self.ARQUIVO_ACESSO)
+            acesso = os.path.getmtime(arquivo_acesso) if os.path.exists(arquivo_acesso) else 0
+            entradas.append((acesso, nome, diretorio, tamanho))
+            tamanho_total += tamanho
+        
+        for _, nome, diretorio, tamanho in sorted(entradas):
+            if tamanho_total <= self.tamanho_maximo:
+                break
+            if nome == preservar:
+                continue
+            shutil.rmtree(diretorio, ignore_errors=True)
+            tamanho_total -= tamanho
+
+def analisar_com_cache(caminho_arquivo, cache, opcoes_intermediacao=None, motor="auto", processos=1, metricas=None,
+                       contrair=False, grafo=None, hash_instancia=None, formato_caminhos="binario"):
+    """
+    Retorna (estatisticas, caminhos) de uma instância, consultando o cache antes de calcular.
+    Em caso de acerto, nada é analisado nem calculado; caminhos é uma MatrizCaminhosBinaria
+    (aceita pelos exportadores de caminhos mínimos), ou None se a entrada não tem as matrizes.
+    Em caso de falta, a instância é analisada, os resultados são guardados no cache e caminhos
+    é o próprio MultigrafoOrientado.
+    
+    Os caminhos mínimos só são calculados (e guardados) quando formato_caminhos ou as métricas
+    pedidas os usam (precisa_caminhos_minimos); com formato_caminhos="nenhum" e apenas métricas
+    baratas, o motor de caminhos mínimos não é executado.
+    
+    grafo, se informado, é o MultigrafoOrientado da mesma instância já lido (e talvez com os
+    caminhos mínimos já calculados), usado em vez de reler o arquivo; hash_instancia evita
+    recalcular o hash do conteúdo.
+    """
+    chave = cache.chave_analise(caminho_arquivo, opcoes_intermediacao, metricas, hash_instancia)
+    calcular_caminhos = precisa_caminhos_minimos(formato_caminhos, metricas)
+    resultado = cache.obter(chave, caminhos=calcular_caminhos)
+    if resultado is not None:
+        return resultado
+    
+    if grafo is None:
+        grafo = analisar_arquivo_dat(caminho_arquivo)
+    if calcular_caminhos:
+        grafo.calcular_caminhos_minimos(motor=motor, processos=processos, contrair=contrair)
+    estatisticas = grafo.calcular_estatisticas(opcoes_intermediacao, metricas)
+    # Matrizes já calculadas em um grafo reaproveitado também são guardadas
+    cache.guardar(chave, grafo, estatisticas, caminhos=grafo._cache_caminhos is not None)
+    return estatisticas, grafo
+
+# Nomes dos arquivos gerados para cada instância no modo em lote
+ARQUIVO_ESTATISTICAS_LOTE = "estatisticas_grafo.json"
+PREFIXO_CAMINHOS_LOTE = "caminhos_minimos"
+ARQUIVO_RESUMO_LOTE = "resumo.csv"
+
+# Extensões reconhecidas como instâncias ao listar um diretório
+EXTENSOES_INSTANCIA = (".dat", ".dat.gz", ".dat.xz", ".dat.bz2")
+
+# Formatos de exportação das matrizes de caminhos mínimos
+FORMATOS_CAMINHOS = ("binario", "json", "ndjson", "ambos", "nenhum")
+
+def precisa_caminhos_minimos(formato_caminhos, metricas=None):
+    """Indica se a exportação ou as métricas pedidas usam a matriz de caminhos mínimos."""
+    if formato_caminhos != "nenhum":
+        return True
+    return any(nome in METRICAS_CAMINHOS for nome in (METRICAS_ESTATISTICAS if metricas is None else metricas))
+
+def listar_instancias(entrada):
+    """
+    Lista os arquivos de instância de um diretório (pelas EXTENSOES_INSTANCIA) ou que casam
+    com um padrão glob, em ordem alfabética.
+    """
+    if os.path.isdir(entrada):
+        arquivos = [os.path.join(entrada, nome) for nome in os.listdir(entrada) if nome.endswith(EXTENSOES_INSTANCIA)]
+    else:
+        arquivos = [caminho for caminho in glob.glob(entrada) if os.path.isfile(caminho)]
+    return sorted(arquivos)
+
+def nome_instancia(caminho_arquivo, raiz=None):
+    """
+    Nome da instância: nome do arquivo sem as extensões .dat e de compactação. Com raiz, o nome
+    mantém os diretórios do caminho relativo a ela (por exemplo, "grupo_a/instancia").
+    """
+    nome = os.path.basename(caminho_arquivo)
+    for extensao in (".gz", ".xz", ".bz2", ".dat"):
+        if nome.endswith(extensao):
+            nome = nome[:-len(extensao)]
+    if raiz is None:
+        return nome
+    diretorio = os.path.relpath(os.path.dirname(os.path.abspath(caminho_arquivo)), raiz)
+    return nome if diretorio == os.curdir else os.path.join(diretorio, nome)
+
+def nomes_instancias(arquivos):
+    """
+    Nomes distintos para as instâncias de um lote, relativos ao diretório comum a todas, de modo
+    que arquivos de mesmo nome em diretórios diferentes não compartilhem a saída. Arquivos que
+    ainda coincidam (como x.dat e x.dat.gz) mantêm o nome completo.
+    """
+    if not arquivos:
+        return []
+    raiz = os.path.commonpath([os.path.dirname(os.path.abspath(caminho)) for caminho in arquivos])
+    nomes = [nome_instancia(caminho, raiz) for caminho in arquivos]
+    contagem = Counter(nomes)
+    repetidos = {nome for nome, vezes in contagem.items() if vezes > 1}
+    return [os.path.relpath(os.path.abspath(caminho), raiz) if nome in repetidos else nome
+            for nome, caminho in zip(nomes, arquivos)]
+
+def _estatisticas_escalares(estatisticas):
+    """Mantém apenas os campos escalares (os que cabem em uma coluna de tabela)."""
+    return {chave: valor for chave, valor in estatisticas.items() if not isinstance(valor, (dict, list, set))}
+
+def _analisar_instancia_lote(caminho_arquivo, diretorio_instancia, formato_caminhos, opcoes_intermediacao, motor,
+                             metricas=None, contrair=False):
+    """Analisa uma instância do lote e grava seus resultados em diretorio_instancia."""
+    inicio = time.perf_counter()
+    os.makedirs(diretorio_instancia, exist_ok=True)
+    
+    grafo = analisar_arquivo_dat(caminho_arquivo)
+    if precisa_caminhos_minimos(formato_caminhos, metricas):
+        grafo.calcular_caminhos_minimos(motor=motor, contrair=contrair)
+    estatisticas = grafo.calcular_estatisticas(opcoes_intermediacao, metricas)
+    
+    prefixo_caminhos = os.path.join(diretorio_instancia, PREFIXO_CAMINHOS_LOTE)
+    if formato_caminhos in ("binario", "ambos"):
+        exportar_caminhos_minimos_binario(grafo, prefixo_caminhos)
+    if formato_caminhos in ("json", "ambos"):
+        exportar_caminhos_minimos(grafo, prefixo_caminhos + ".json")
+    if formato_caminhos == "ndjson":
+        exportar_caminhos_minimos_ndjson(grafo, prefixo_caminhos + ".ndjson")
+    # As estatísticas são gravadas por último: sua presença indica instância concluída
+    gravar_estatisticas(estatisticas, os.path.join(diretorio_instancia, ARQUIVO_ESTATISTICAS_LOTE))
+    
+    return _estatisticas_escalares(estatisticas), time.perf_counter() - inicio
+
+def analisar_lote(arquivos, diretorio_saida, processos=1, formato_caminhos="binario",
+                  opcoes_intermediacao=None, motor="auto", retomar=True, progresso=print, metricas=None,
+                  contrair=False):
+    """
+    Analisa várias instâncias em paralelo (uma por processo) e grava os resultados de cada uma
+    em diretorio_saida/<nome da instância>/ (nomes_instancias), além de uma tabela resumo.csv com os campos
+    escalares de calcular_estatisticas (uma linha por instância). metricas restringe os campos
+    calculados e formato_caminhos="nenhum" dispensa a exportação das matrizes; motor e contrair
+    são repassados a calcular_caminhos_minimos.
+    
+    Com retomar=True, instâncias cujas estatísticas já existem no diretório de saída não são
+    recalculadas. Falhas em uma instância são relatadas sem interromper o lote.
+    Retorna a lista de linhas do resumo.
+    """
+    os.makedirs(diretorio_saida, exist_ok=True)
+    total = len(arquivos)
+    linhas = []
+    pendentes = []
+    concluidas = 0
+    
+    for nome, caminho_arquivo in zip(nomes_instancias(arquivos), arquivos):
+        arquivo_estatisticas = os.path.join(diretorio_saida, nome, ARQUIVO_ESTATISTICAS_LOTE)
+        if retomar and os.path.isfile(arquivo_estatisticas):
+            with open(arquivo_estatisticas, 'r') as arquivo:
+                estatisticas = _estatisticas_escalares(json.load(arquivo))
+            linhas.append({"instancia": nome, "arquivo": caminho_arquivo, "tempo_segundos": None, **estatisticas})
+            concluidas += 1
+            progresso(f"[{concluidas}/{total}] {nome}: resultados já existentes, ignorada")
+        else:
+            pendentes.append((nome, caminho_arquivo))
+    
+    with ProcessPoolExecutor(max_workers=max(1, processos)) as executor:
+        futuros = {
+            executor.submit(_analisar_instancia_lote, caminho_arquivo, os.path.join(diretorio_saida, nome),
+                            formato_caminhos, opcoes_intermediacao, motor, metricas, contrair): (nome, caminho_arquivo)
+            for nome, caminho_arquivo in pendentes
+        }
+        for futuro in as_completed(futuros):
+            nome, caminho_arquivo = futuros[futuro]
+            concluidas += 1
+            try:
+                estatisticas, duracao = futuro.result()
+            except Exception as erro:
+                progresso(f"[{concluidas}/{total}] {nome}: erro: {erro}")
+                continue
+            linhas.append({"instancia": nome, "arquivo": caminho_arquivo, "tempo_segundos": round(duracao, 6), **estatisticas})
+            progresso(f"[{concluidas}/{total}] {nome}: concluída em {duracao:.2f}s")
+    
+    linhas.sort(key=lambda linha: linha["instancia"])
+    gravar_resumo_csv(linhas, os.path.join(diretorio_saida, ARQUIVO_RESUMO_LOTE))
+    return linhas
+
+def gravar_resumo_csv(linhas, arquivo_saida):
+    """Grava as linhas do resumo do lote em CSV, com uma coluna por campo."""
+    colunas = ["instancia", "arquivo", "tempo_segundos"]
+    for linha in linhas:
+        colunas += [chave for chave in linha if chave not in colunas]
+    
+    with open(arquivo_saida, 'w', newline='') as arquivo:
+        escritor = csv.DictWriter(arquivo, fieldnames=colunas)
+        escritor.writeheader()
+        escritor.writerows(linhas)
+
+# Campos impressos por main: (chave, rótulo, formato)
+CAMPOS_RESUMO = (
+    ("num_nos", "Número de nós", ""),
+    ("num_arestas", "Número de arestas", ""),
+    ("num_arcos", "Número de arcos", ""),
+    ("num_nos_requeridos", "Número de nós requeridos", ""),
+    ("num_arestas_requeridas", "Número de arestas requeridas", ""),
+    ("num_arcos_requeridos", "Número de arcos requeridos", ""),
+    ("densidade", "Densidade do grafo", ".4f"),
+    ("componentes_conectados", "Número de componentes conectados", ""),
+    ("componentes_fortemente_conectados", "Número de componentes fortemente conectados", ""),
+    ("grau_minimo", "Grau mínimo", ""),
+    ("grau_maximo", "Grau máximo", ""),
+    ("comprimento_medio_caminho", "Comprimento médio do caminho", ".4f"),
+    ("diametro", "Diâmetro do grafo", ""),
+    ("raio", "Raio do grafo", ""),
+    ("excentricidade_deposito", "Excentricidade do depósito", ""),
+)
 
 def main():
     """
     Função principal para analisar um arquivo .dat, calcular estatísticas e exportar resultados.
     """
-    # Verifica se o caminho do arquivo foi fornecido como argumento de linha de comando
-    if len(sys.argv) > 1:
-        caminho_arquivo = sys.argv[1]
-    else:
-        # Caminho padrão do arquivo - SUBSTITUA PELO CAMINHO DO SEU ARQUIVO .dat
-        caminho_arquivo = "dados_grafo.dat"
+    parser = argparse.ArgumentParser(description="Análise de multigrafos orientados a partir de arquivos .dat.")
+    # Caminho padrão do arquivo - SUBSTITUA PELO CAMINHO DO SEU ARQUIVO .dat
+    parser.add_argument("arquivo", nargs="?", default="dados_grafo.dat", help="arquivo .dat de entrada")
+    parser.add_argument("--motor", choices=MOTORES_CAMINHOS, default="auto",
+                        help="implementação do cálculo de caminhos mínimos")
+    parser.add_argument("-p", "--processos", type=int, default=1,
+                        help="número de processos para o cálculo de caminhos mínimos "
+                             "(no modo --lote, número de instâncias analisadas em paralelo)")
+    parser.add_argument("--contrair", action="store_true",
+                        help="calcula os caminhos mínimos sobre o grafo com as cadeias de nós não requeridos "
+                             "de grau 2 contraídas e expande o resultado para todos os nós")
+    parser.add_argument("--amostras-intermediacao", type=int,
+                        help="estima a intermediação com este número de origens sorteadas")
+    parser.add_argument("--tempo-intermediacao", type=float,
+                        help="estima a intermediação sorteando origens até este prazo (segundos)")
+    parser.add_argument("--estrategia-amostragem", choices=ESTRATEGIAS_AMOSTRAGEM, default="uniforme",
+                        help="distribuição de sorteio das origens na estimativa da intermediação")
+    parser.add_argument("--semente", type=int, default=0, help="semente do sorteio de origens")
+    parser.add_argument("--formato-caminhos", choices=FORMATOS_CAMINHOS, default="binario",
+                        help="formato de exportação das matrizes de caminhos mínimos")
+    parser.add_argument("--compactar", action="store_true",
+                        help="grava os caminhos mínimos em JSON/NDJSON compactados com gzip (.gz)")
+    parser.add_argument("--metricas", metavar="CAMPO[,CAMPO...]",
+                        help="calcula apenas estes campos das estatísticas (ex.: num_nos,densidade,diametro); "
+                             f"opções: {', '.join(METRICAS_ESTATISTICAS)}")
+    parser.add_argument("--matriz-servicos", action="store_true",
+                        help="exporta também a matriz de custos entre depósito e serviços requeridos")
+    parser.add_argument("--cache", metavar="DIRETORIO",
+                        help="reaproveita resultados guardados neste diretório para instâncias já analisadas")
+    parser.add_argument("--cache-tamanho-maximo", type=int, default=TAMANHO_MAXIMO_CACHE // (1024 * 1024),
+                        metavar="MB", help="tamanho máximo do cache em disco")
+    parser.add_argument("--instrumentacao", metavar="ARQUIVO_JSON",
+                        help="grava um relatório JSON com a duração de cada etapa da análise "
+                             f"(também ativado pela variável de ambiente {VARIAVEL_INSTRUMENTACAO})")
+    parser.add_argument("--perfil", action="store_true",
+                        help="inclui no relatório o perfil de execução (cProfile) e grava ARQUIVO_JSON.prof")
+    parser.add_argument("--rastrear-memoria", action="store_true",
+                        help="inclui no relatório a memória alocada por etapa e as maiores alocações (tracemalloc)")
+    parser.add_argument("--lote", metavar="DIRETORIO_OU_PADRAO",
+                        help="analisa todas as instâncias de um diretório ou padrão glob")
+    parser.add_argument("--saida", default="resultados",
+                        help="diretório de saída do modo --lote (um subdiretório por instância)")
+    parser.add_argument("--recalcular", action="store_true",
+                        help="no modo --lote, recalcula também instâncias com resultados existentes")
+    args = parser.parse_args()
+    
+    metricas = None
+    if args.metricas:
+        metricas = [nome.strip() for nome in args.metricas.split(",") if nome.strip()]
+        desconhecidas = [nome for nome in metricas if nome not in METRICAS_ESTATISTICAS]
+        if desconhecidas:
+            parser.error(f"métricas desconhecidas: {', '.join(desconhecidas)}")
+    if args.amostras_intermediacao is not None and args.amostras_intermediacao < 1:
+        parser.error("--amostras-intermediacao deve ser ao menos 1")
+    if args.tempo_intermediacao is not None and args.tempo_intermediacao <= 0:
+        parser.error("--tempo-intermediacao deve ser positivo")
+    
+    opcoes_intermediacao = {
+        "amostras": args.amostras_intermediacao,
+        "tempo_limite": args.tempo_intermediacao,
+        "estrategia": args.estrategia_amostragem,
+        "semente": args.semente,
+    }
+    
+    arquivo_instrumentacao = args.instrumentacao or os.environ.get(VARIAVEL_INSTRUMENTACAO)
+    if (args.perfil or args.rastrear_memoria) and not arquivo_instrumentacao:
+        arquivo_instrumentacao = "instrumentacao.json"
+    if arquivo_instrumentacao:
+        ativar_instrumentacao(perfil=args.perfil, memoria=args.rastrear_memoria)
+    
+    try:
+        executar_analise(args, metricas, opcoes_intermediacao)
+    finally:
+        instrumentacao = desativar_instrumentacao()
+        if instrumentacao is not None:
+            instrumentacao.gravar(arquivo_instrumentacao)
+            print(f"Relatório de instrumentação exportado para: {arquivo_instrumentacao}")
+
+def executar_analise(args, metricas=None, opcoes_intermediacao=None):
+    """Executa a análise pedida na linha de comando (instância única ou lote) e exporta os resultados."""
+    caminho_arquivo = args.arquivo
+    
+    if args.lote:
+        arquivos = listar_instancias(args.lote)
+        if not arquivos:
+            print(f"Erro: nenhuma instância encontrada em '{args.lote}'.")
+            return
+        print(f"Analisando {len(arquivos)} instâncias com {args.processos} processo(s)")
+        with medir("analisar_lote", instancias=len(arquivos), processos=args.processos):
+            analisar_lote(arquivos, args.saida, args.processos, args.formato_caminhos, opcoes_intermediacao,
+                          motor=args.motor, retomar=not args.recalcular, metricas=metricas, contrair=args.contrair)
+        print(f"Resumo exportado para: {os.path.join(args.saida, ARQUIVO_RESUMO_LOTE)}")
+        return
     
     # Verifica se o arquivo existe
     if not os.path.isfile(caminho_arquivo):
@@ -531,32 +2748,61 @@ def main():
     
     # Analisa o arquivo .dat
     print(f"Analisando arquivo: {caminho_arquivo}")
-    grafo = analisar_arquivo_dat(caminho_arquivo)
+    if args.cache:
+        # Com cache, "grafo" pode ser o grafo analisado ou as matrizes guardadas (MatrizCaminhosBinaria)
+        cache = CacheResultados(args.cache, args.cache_tamanho_maximo * 1024 * 1024)
+        estatisticas, grafo = analisar_com_cache(caminho_arquivo, cache, opcoes_intermediacao,
+                                                 motor=args.motor, processos=args.processos, metricas=metricas,
+                                                 contrair=args.contrair, formato_caminhos=args.formato_caminhos)
+    else:
+        grafo = analisar_arquivo_dat(caminho_arquivo)
+        
+        # Calcula os caminhos mínimos uma vez (se forem usados); estatísticas e exportação
+        # reaproveitam o resultado
+        if precisa_caminhos_minimos(args.formato_caminhos, metricas):
+            grafo.calcular_caminhos_minimos(motor=args.motor, processos=args.processos, contrair=args.contrair)
+        estatisticas = grafo.calcular_estatisticas(opcoes_intermediacao, metricas)
     
     # Exporta estatísticas
     arquivo_estatisticas = "estatisticas_grafo.json"
-    estatisticas = exportar_estatisticas(grafo, arquivo_estatisticas)
+    gravar_estatisticas(estatisticas, arquivo_estatisticas)
     print(f"Estatísticas exportadas para: {arquivo_estatisticas}")
     
     # Exporta caminhos mínimos
-    arquivo_caminhos = "caminhos_minimos.json"
-    caminhos = exportar_caminhos_minimos(grafo, arquivo_caminhos)
-    print(f"Caminhos mínimos exportados para: {arquivo_caminhos}")
+    try:
+        if args.formato_caminhos in ("binario", "ambos"):
+            prefixo_caminhos = "caminhos_minimos"
+            exportar_caminhos_minimos_binario(grafo, prefixo_caminhos)
+            print(f"Caminhos mínimos exportados para: {prefixo_caminhos}{SUFIXO_CABECALHO_BINARIO}, "
+                  f"{prefixo_caminhos}{SUFIXO_DISTANCIAS_BINARIO} e {prefixo_caminhos}{SUFIXO_PREDECESSORES_BINARIO}")
+        sufixo_compactacao = ".gz" if args.compactar else ""
+        if args.formato_caminhos in ("json", "ambos"):
+            arquivo_caminhos = "caminhos_minimos.json" + sufixo_compactacao
+            exportar_caminhos_minimos(grafo, arquivo_caminhos)
+            print(f"Caminhos mínimos exportados para: {arquivo_caminhos}")
+        if args.formato_caminhos == "ndjson":
+            arquivo_caminhos = "caminhos_minimos.ndjson" + sufixo_compactacao
+            exportar_caminhos_minimos_ndjson(grafo, arquivo_caminhos)
+            print(f"Caminhos mínimos exportados para: {arquivo_caminhos}")
+    finally:
+        # Acerto de cache: libera os mapeamentos das matrizes guardadas
+        if isinstance(grafo, MatrizCaminhosBinaria):
+            grafo.fechar()
+    
+    # Exporta a matriz de custos entre serviços requeridos
+    if args.matriz_servicos:
+        if not isinstance(grafo, MultigrafoOrientado):
+            # Acerto de cache: as matrizes guardadas não trazem as ligações requeridas
+            grafo = analisar_arquivo_dat(caminho_arquivo)
+        arquivo_servicos = "matriz_servicos.json"
+        exportar_matriz_servicos(grafo, arquivo_servicos)
+        print(f"Matriz de serviços exportada para: {arquivo_servicos}")
     
-    # Imprime estatísticas básicas
+    # Imprime estatísticas básicas (apenas as calculadas)
     print("\nEstatísticas Básicas do Grafo:")
-    print(f"Número de nós: {estatisticas['num_nos']}")
-    print(f"Número de arestas: {estatisticas['num_arestas']}")
-    print(f"Número de arcos: {estatisticas['num_arcos']}")
-    print(f"Número de nós requeridos: {estatisticas['num_nos_requeridos']}")
-    print(f"Número de arestas requeridas: {estatisticas['num_arestas_requeridas']}")
-    print(f"Número de arcos requeridos: {estatisticas['num_arcos_requeridos']}")
-    print(f"Densidade do grafo: {estatisticas['densidade']:.4f}")
-    print(f"Número de componentes conectados: {estatisticas['componentes_conectados']}")
-    print(f"Grau mínimo: {estatisticas['grau_minimo']}")
-    print(f"Grau máximo: {estatisticas['grau_maximo']}")
-    print(f"Comprimento médio do caminho: {estatisticas['comprimento_medio_caminho']:.4f}")
-    print(f"Diâmetro do grafo: {estatisticas['diametro']}")
+    for chave, rotulo, formato in CAMPOS_RESUMO:
+        if chave in estatisticas:
+            print(f"{rotulo}: {estatisticas[chave]:{formato}}")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
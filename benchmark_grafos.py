@@ -0,0 +1,443 @@
+"""
+Benchmarks do módulo de análise de grafos.
+
+    python benchmark_grafos.py etapas --tamanhos 100,200,400 --saida benchmark.json
+    python benchmark_grafos.py incremental --nos 300 --alteracoes 20
+    python benchmark_grafos.py puro --tamanhos 100,200,300 dados_grafo.dat
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import tempfile
+import time
+import tracemalloc
+
+import analise_grafos
+from analise_grafos import (MultigrafoOrientado, MOTORES_CAMINHOS, analisar_arquivo_dat, exportar_caminhos_minimos,
+                            exportar_caminhos_minimos_binario, exportar_caminhos_minimos_ndjson, exportar_estatisticas)
+
+def gerar_multigrafo_aleatorio(num_nos, num_arestas, num_arcos, semente=0, custo_maximo=10,
+                               fracao_requeridos=0.0, fracao_paralelas=0.0, demanda_maxima=10):
+    """
+    Gera um multigrafo orientado aleatório e conexo: as primeiras num_nos - 1 arestas formam
+    uma árvore geradora aleatória e as demais ligações ligam pares sorteados.
+    
+    Cada nó e cada ligação é requerido com probabilidade fracao_requeridos (com demanda e custo
+    de atendimento sorteados entre 1 e demanda_maxima). Com probabilidade fracao_paralelas,
+    uma ligação fora da árvore repete o par de uma ligação anterior do mesmo tipo.
+    """
+    gerador = random.Random(semente)
+    grafo = MultigrafoOrientado()
+
+    def requerido():
+        return fracao_requeridos > 0 and gerador.random() < fracao_requeridos
+
+    def atributos():
+        # (demanda, custo_servico, requerido)
+        if requerido():
+            demanda = gerador.randint(1, demanda_maxima)
+            return demanda, demanda, True
+        return 0, 0, False
+
+    def par(pares):
+        if fracao_paralelas > 0 and pares and gerador.random() < fracao_paralelas:
+            return gerador.choice(pares)
+        return gerador.randint(1, num_nos), gerador.randint(1, num_nos)
+
+    for no in range(1, num_nos + 1):
+        demanda, custo_servico, no_requerido = atributos() if no != 1 else (0, 0, False)
+        grafo.adicionar_no(no, demanda, custo_servico, no_requerido)
+
+    nos = list(range(1, num_nos + 1))
+    gerador.shuffle(nos)
+    pares_arestas = []
+    for i in range(1, min(num_arestas + 1, num_nos)):
+        u, v = nos[i], nos[gerador.randrange(i)]
+        grafo.adicionar_aresta(u, v, gerador.randint(1, custo_maximo), *atributos())
+        pares_arestas.append((u, v))
+    for _ in range(num_arestas - (num_nos - 1)):
+        u, v = par(pares_arestas)
+        grafo.adicionar_aresta(u, v, gerador.randint(1, custo_maximo), *atributos())
+        pares_arestas.append((u, v))
+    pares_arcos = []
+    for _ in range(num_arcos):
+        u, v = par(pares_arcos)
+        grafo.adicionar_arco(u, v, gerador.randint(1, custo_maximo), *atributos())
+        pares_arcos.append((u, v))
+
+    grafo.deposito = 1
+    return grafo
+
+def escrever_instancia_dat(grafo, arquivo_saida):
+    """
+    Grava o grafo no formato .dat lido por analisar_arquivo_dat: cabeçalho, nós requeridos
+    (ReN.), arestas requeridas (ReE.) e não requeridas (EDGE), arcos requeridos (ReA.) e não
+    requeridos (ARC).
+    """
+    arestas_requeridas, arestas, arcos_requeridos, arcos = [], [], [], []
+    for (u, v), lista_arestas in sorted(grafo.arestas.items()):
+        for custo, demanda, requerido, custo_servico in lista_arestas:
+            (arestas_requeridas if requerido else arestas).append((u, v, custo, demanda, custo_servico))
+    for (u, v), lista_arcos in sorted(grafo.arcos.items()):
+        for custo, demanda, requerido, custo_servico in lista_arcos:
+            (arcos_requeridos if requerido else arcos).append((u, v, custo, demanda, custo_servico))
+
+    with open(arquivo_saida, 'w') as arquivo:
+        arquivo.write(f"Name:\t\t{grafo.nome or os.path.splitext(os.path.basename(arquivo_saida))[0]}\n")
+        arquivo.write(f"Optimal value:\t{grafo.valor_otimo if grafo.valor_otimo is not None else -1}\n")
+        if grafo.veiculos is not None:
+            arquivo.write(f"#Vehicles:\t{grafo.veiculos}\n")
+        if grafo.capacidade is not None:
+            arquivo.write(f"Capacity:\t{grafo.capacidade}\n")
+        if grafo.deposito is not None:
+            arquivo.write(f"Depot Node:\t{grafo.deposito}\n")
+        arquivo.write(f"#Nodes:\t\t{len(grafo.nos)}\n")
+        arquivo.write(f"#Edges:\t\t{len(arestas_requeridas) + len(arestas)}\n")
+        arquivo.write(f"#Arcs:\t\t{len(arcos_requeridos) + len(arcos)}\n")
+        arquivo.write(f"#Required N:\t{len(grafo.nos_requeridos)}\n")
+        arquivo.write(f"#Required E:\t{len(arestas_requeridas)}\n")
+        arquivo.write(f"#Required A:\t{len(arcos_requeridos)}\n")
+
+        arquivo.write("\nReN.\tDEMAND\tS. COST\n")
+        for no in sorted(grafo.nos_requeridos):
+            arquivo.write(f"N{no}\t{grafo.demandas_nos.get(no, 0)}\t{grafo.custos_servico_nos.get(no, 0)}\n")
+
+        arquivo.write("\nReE.\tFROM N.\tTO N.\tT. COST\tDEMAND\tS. COST\n")
+        for k, (u, v, custo, demanda, custo_servico) in enumerate(arestas_requeridas, 1):
+            arquivo.write(f"E{k}\t{u}\t{v}\t{custo}\t{demanda}\t{custo_servico}\n")
+
+        arquivo.write("\nEDGE\tFROM N.\tTO N.\tT. COST\n")
+        for k, (u, v, custo, _, _) in enumerate(arestas, 1):
+            arquivo.write(f"NrE{k}\t{u}\t{v}\t{custo}\n")
+
+        arquivo.write("\nReA.\tFROM N.\tTO N.\tT. COST\tDEMAND\tS. COST\n")
+        for k, (u, v, custo, demanda, custo_servico) in enumerate(arcos_requeridos, 1):
+            arquivo.write(f"A{k}\t{u}\t{v}\t{custo}\t{demanda}\t{custo_servico}\n")
+
+        arquivo.write("\nARC\tFROM N.\tTO N.\tT. COST\n")
+        for k, (u, v, custo, _, _) in enumerate(arcos, 1):
+            arquivo.write(f"NrA{k}\t{u}\t{v}\t{custo}\n")
+
+def gerar_instancia_dat(arquivo_saida, num_nos, razao_arestas=1.0, razao_arcos=1.5, semente=0, custo_maximo=10,
+                        fracao_requeridos=0.5, fracao_paralelas=0.05, capacidade=75, veiculos=10):
+    """
+    Gera uma instância sintética com num_nos nós, razao_arestas·num_nos arestas (no mínimo
+    num_nos - 1, para formar a árvore geradora) e razao_arcos·num_nos arcos, e a grava no
+    formato .dat. Retorna o grafo gerado.
+    """
+    num_arestas = max(num_nos - 1, round(razao_arestas * num_nos))
+    num_arcos = round(razao_arcos * num_nos)
+    grafo = gerar_multigrafo_aleatorio(num_nos, num_arestas, num_arcos, semente, custo_maximo,
+                                       fracao_requeridos, fracao_paralelas)
+    grafo.nome = os.path.splitext(os.path.basename(arquivo_saida))[0]
+    grafo.capacidade = capacidade
+    grafo.veiculos = veiculos
+    escrever_instancia_dat(grafo, arquivo_saida)
+    return grafo
+
+def _alteracao_aleatoria(grafo, gerador, custo_maximo):
+    """Aplica ao grafo uma alteração sorteada: novo arco, mudança de custo ou remoção de ligação."""
+    operacao = gerador.choice(("adicionar_arco", "alterar_aresta", "alterar_arco", "remover_arco"))
+    if operacao == "adicionar_arco":
+        nos = sorted(grafo.nos)
+        grafo.adicionar_arco(gerador.choice(nos), gerador.choice(nos), gerador.randint(1, custo_maximo))
+    elif operacao == "alterar_aresta" and grafo.arestas:
+        chave = gerador.choice(sorted(grafo.arestas))
+        grafo.alterar_custo_aresta(*chave, gerador.randint(1, custo_maximo))
+    elif operacao == "alterar_arco" and grafo.arcos:
+        chave = gerador.choice(sorted(grafo.arcos))
+        grafo.alterar_custo_arco(*chave, gerador.randint(1, custo_maximo))
+    elif grafo.arcos:
+        grafo.remover_arco(*gerador.choice(sorted(grafo.arcos)))
+    return operacao
+
+def medir_atualizacao_incremental(grafo, alteracoes=20, motor="auto", semente=0, custo_maximo=10):
+    """
+    Compara, para uma sequência de alterações aleatórias, o tempo da atualização incremental
+    dos caminhos mínimos com o de um recálculo completo. Após cada alteração, as distâncias
+    incrementais são conferidas com as do recálculo. Retorna um dicionário com os tempos
+    médios (em segundos) e a aceleração obtida.
+    """
+    gerador = random.Random(semente)
+    grafo.calcular_caminhos_minimos(motor=motor)
+    tempo_incremental = 0.0
+    tempo_completo = 0.0
+
+    for _ in range(alteracoes):
+        inicio = time.perf_counter()
+        _alteracao_aleatoria(grafo, gerador, custo_maximo)
+        tempo_incremental += time.perf_counter() - inicio
+        dist_incremental = [list(linha) for linha in grafo.calcular_caminhos_minimos()[0]]
+
+        inicio = time.perf_counter()
+        grafo.invalidar_cache()
+        dist_completa = grafo.calcular_caminhos_minimos(motor=motor)[0]
+        tempo_completo += time.perf_counter() - inicio
+
+        if dist_incremental != dist_completa:
+            raise AssertionError("A atualização incremental divergiu do recálculo completo.")
+
+    return {
+        "alteracoes": alteracoes,
+        "tempo_medio_incremental": tempo_incremental / alteracoes,
+        "tempo_medio_completo": tempo_completo / alteracoes,
+        "aceleracao": tempo_completo / tempo_incremental if tempo_incremental > 0 else float('inf'),
+    }
+
+def floyd_warshall_referencia(grafo):
+    """
+    Floyd-Warshall em Python puro na forma anterior ao caminho rápido, mantido como base de
+    comparação: o custo mínimo de cada vizinho é recalculado das listas de ligações
+    (tuple(sorted(...)) e min a cada consulta) e o laço triplo indexa dist[i][k] e dist[k][j]
+    a cada passo, sem pular as linhas que não alcançam k.
+    """
+    def custo_minimo(u, v):
+        chave_aresta = tuple(sorted([u, v]))
+        custo_aresta = float('inf')
+        if chave_aresta in grafo.arestas:
+            custo_aresta = min(custo for custo, _, _, _ in grafo.arestas[chave_aresta])
+        custo_arco = float('inf')
+        if (u, v) in grafo.arcos:
+            custo_arco = min(custo for custo, _, _, _ in grafo.arcos[(u, v)])
+        return min(custo_aresta, custo_arco)
+
+    lista_nos = sorted(list(grafo.nos))
+    no_para_indice = {no: i for i, no in enumerate(lista_nos)}
+    n = len(lista_nos)
+    dist = [[float('inf') for _ in range(n)] for _ in range(n)]
+    pred = [[-1 for _ in range(n)] for _ in range(n)]
+    for i in range(n):
+        dist[i][i] = 0
+    for i, u in enumerate(lista_nos):
+        for v in grafo.obter_vizinhos(u):
+            j = no_para_indice[v]
+            custo = custo_minimo(u, v)
+            if custo < dist[i][j]:
+                dist[i][j] = custo
+                pred[i][j] = i
+
+    for k in range(n):
+        for i in range(n):
+            for j in range(n):
+                if dist[i][k] + dist[k][j] < dist[i][j]:
+                    dist[i][j] = dist[i][k] + dist[k][j]
+                    pred[i][j] = pred[k][j]
+
+    return dist, pred, lista_nos
+
+def medir_caminho_puro(grafos, repeticoes=3):
+    """
+    Compara floyd_warshall_referencia com calcular_caminhos_minimos(motor="python") nos mesmos
+    grafos (lista de (nome, MultigrafoOrientado)), conferindo que as matrizes de distâncias e
+    de predecessores são idênticas. Retorna, por grafo, o menor tempo de cada versão em
+    `repeticoes` execuções (em segundos) e a aceleração.
+    """
+    resultados = []
+    for nome, grafo in grafos:
+        tempos_referencia, tempos_rapido = [], []
+        for _ in range(repeticoes):
+            inicio = time.perf_counter()
+            referencia = floyd_warshall_referencia(grafo)
+            tempos_referencia.append(time.perf_counter() - inicio)
+
+            grafo.invalidar_cache()
+            inicio = time.perf_counter()
+            rapido = grafo.calcular_caminhos_minimos(motor="python")
+            tempos_rapido.append(time.perf_counter() - inicio)
+
+            if list(referencia) != list(rapido):
+                raise AssertionError(f"{nome}: o caminho rápido divergiu da implementação de referência.")
+
+        resultados.append({
+            "instancia": nome,
+            "num_nos": len(grafo.nos),
+            "tempo_referencia": min(tempos_referencia),
+            "tempo_rapido": min(tempos_rapido),
+            "aceleracao": min(tempos_referencia) / min(tempos_rapido),
+        })
+    return resultados
+
+class MedidorEtapas:
+    """
+    Mede o tempo (perf_counter) e, opcionalmente, o pico de memória alocada pelo Python
+    (tracemalloc) de cada etapa executada com medir(nome, funcao). Com tracemalloc ativo,
+    os tempos incluem o custo do rastreamento de alocações.
+    """
+    def __init__(self, medir_memoria=True):
+        self.medir_memoria = medir_memoria
+        self.etapas = {}
+
+    def medir(self, nome, funcao, *argumentos, **opcoes):
+        """Executa funcao(*argumentos, **opcoes), registra suas medidas e retorna o resultado."""
+        if self.medir_memoria:
+            tracemalloc.start()
+        inicio = time.perf_counter()
+        try:
+            resultado = funcao(*argumentos, **opcoes)
+        finally:
+            duracao = time.perf_counter() - inicio
+            medidas = {"tempo_segundos": duracao}
+            if self.medir_memoria:
+                medidas["memoria_pico_bytes"] = tracemalloc.get_traced_memory()[1]
+                tracemalloc.stop()
+            self.etapas[nome] = medidas
+        return resultado
+
+def medir_etapas(num_nos, diretorio, razao_arestas=1.0, razao_arcos=1.5, fracao_requeridos=0.5,
+                 fracao_paralelas=0.05, motor="auto", semente=0, medir_memoria=True, intermediacao=True):
+    """
+    Gera uma instância sintética com num_nos nós em diretorio e mede cada etapa do fluxo de
+    analise_grafos.main sobre ela: leitura do .dat, caminhos mínimos, centralidade de
+    intermediação, demais estatísticas e exportadores. Retorna um dicionário com o tamanho
+    da instância e as medidas de cada etapa (tempo em segundos e pico de memória em bytes).
+    """
+    prefixo = os.path.join(diretorio, f"sintetica_{num_nos}")
+    gerar_instancia_dat(prefixo + ".dat", num_nos, razao_arestas, razao_arcos, semente,
+                        fracao_requeridos=fracao_requeridos, fracao_paralelas=fracao_paralelas)
+    medidor = MedidorEtapas(medir_memoria)
+
+    grafo = medidor.medir("analisar_arquivo_dat", analisar_arquivo_dat, prefixo + ".dat")
+    medidor.medir("calcular_caminhos_minimos", grafo.calcular_caminhos_minimos, motor=motor)
+    metricas = [nome for nome in analise_grafos.METRICAS_ESTATISTICAS if nome != "centralidade_intermediacao"]
+    if intermediacao:
+        medidor.medir("calcular_centralidade_intermediacao", grafo.calcular_centralidade_intermediacao)
+    estatisticas = medidor.medir("calcular_estatisticas", grafo.calcular_estatisticas, metricas=metricas)
+    if intermediacao:
+        # As estatísticas exportadas incluem a intermediação (recalculada pelo exportador)
+        metricas = None
+    medidor.medir("exportar_estatisticas", exportar_estatisticas, grafo, prefixo + ".estatisticas.json",
+                  metricas=metricas)
+    medidor.medir("exportar_caminhos_minimos", exportar_caminhos_minimos, grafo, prefixo + ".caminhos.json")
+    medidor.medir("exportar_caminhos_minimos_ndjson", exportar_caminhos_minimos_ndjson, grafo, prefixo + ".ndjson")
+    medidor.medir("exportar_caminhos_minimos_binario", exportar_caminhos_minimos_binario, grafo, prefixo)
+
+    return {
+        "num_nos": estatisticas["num_nos"],
+        "num_arestas": estatisticas["num_arestas"],
+        "num_arcos": estatisticas["num_arcos"],
+        "num_nos_requeridos": estatisticas["num_nos_requeridos"],
+        "num_arestas_requeridas": estatisticas["num_arestas_requeridas"],
+        "num_arcos_requeridos": estatisticas["num_arcos_requeridos"],
+        "tamanho_arquivo_bytes": os.path.getsize(prefixo + ".dat"),
+        "etapas": medidor.etapas,
+    }
+
+def executar_suite(tamanhos, arquivo_saida=None, diretorio=None, progresso=print, **opcoes):
+    """
+    Executa medir_etapas para cada tamanho (número de nós) e retorna os resultados com os dados
+    do ambiente (versões do Python e do numpy, plataforma, data). Se arquivo_saida for dado,
+    grava os resultados em JSON, para comparação entre versões. As instâncias geradas ficam em
+    diretorio (por padrão, um diretório temporário removido ao final).
+    """
+    numpy = analise_grafos.np
+    resultado = {
+        "data": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "numpy": numpy.__version__ if numpy is not None else None,
+        "plataforma": platform.platform(),
+        "versao_algoritmos": analise_grafos.VERSAO_ALGORITMOS,
+        "opcoes": opcoes,
+        "tamanhos": [],
+    }
+
+    with tempfile.TemporaryDirectory() as temporario:
+        diretorio = diretorio or temporario
+        os.makedirs(diretorio, exist_ok=True)
+        for num_nos in tamanhos:
+            medidas = medir_etapas(num_nos, diretorio, **opcoes)
+            resultado["tamanhos"].append(medidas)
+            progresso(_resumo_medidas(medidas))
+
+    if arquivo_saida:
+        with open(arquivo_saida, 'w') as arquivo:
+            json.dump(resultado, arquivo, indent=2)
+    return resultado
+
+def _resumo_medidas(medidas):
+    """Texto com o tempo (e a memória, se medida) de cada etapa de um tamanho."""
+    linhas = [f"{medidas['num_nos']} nós, {medidas['num_arestas']} arestas, {medidas['num_arcos']} arcos:"]
+    for nome, etapa in medidas["etapas"].items():
+        linha = f"  {nome:<36} {etapa['tempo_segundos'] * 1000:10.2f} ms"
+        if "memoria_pico_bytes" in etapa:
+            linha += f" {etapa['memoria_pico_bytes'] / (1024 * 1024):10.2f} MiB"
+        linhas.append(linha)
+    return "\n".join(linhas)
+
+def main():
+    """
+    Executa a suíte de etapas, o benchmark de atualização incremental dos caminhos mínimos ou a
+    comparação do Floyd-Warshall em Python puro com a versão anterior.
+    """
+    parser = argparse.ArgumentParser(description="Benchmarks do módulo de análise de grafos.")
+    subcomandos = parser.add_subparsers(dest="comando", required=True)
+
+    etapas = subcomandos.add_parser("etapas", help="mede cada etapa da análise em instâncias sintéticas")
+    etapas.add_argument("--tamanhos", default="100,200,400",
+                        help="números de nós das instâncias geradas, separados por vírgula")
+    etapas.add_argument("--razao-arestas", type=float, default=1.0, help="arestas por nó")
+    etapas.add_argument("--razao-arcos", type=float, default=1.5, help="arcos por nó")
+    etapas.add_argument("--fracao-requeridos", type=float, default=0.5,
+                        help="probabilidade de cada nó ou ligação ser requerido")
+    etapas.add_argument("--fracao-paralelas", type=float, default=0.05,
+                        help="probabilidade de cada ligação repetir um par já ligado")
+    etapas.add_argument("--motor", choices=MOTORES_CAMINHOS, default="auto")
+    etapas.add_argument("--semente", type=int, default=0)
+    etapas.add_argument("--sem-memoria", action="store_true",
+                        help="não mede o pico de memória (tempos sem o custo do tracemalloc)")
+    etapas.add_argument("--sem-intermediacao", action="store_true",
+                        help="não mede a centralidade de intermediação (a etapa mais cara)")
+    etapas.add_argument("--instancias", metavar="DIRETORIO",
+                        help="mantém as instâncias e saídas geradas neste diretório")
+    etapas.add_argument("--saida", default="benchmark_grafos.json", help="arquivo JSON com os resultados")
+
+    incremental = subcomandos.add_parser("incremental", help="compara atualização incremental e recálculo")
+    incremental.add_argument("--nos", type=int, default=300)
+    incremental.add_argument("--arestas", type=int, default=400)
+    incremental.add_argument("--arcos", type=int, default=600)
+    incremental.add_argument("--alteracoes", type=int, default=20)
+    incremental.add_argument("--motor", choices=MOTORES_CAMINHOS, default="auto")
+    incremental.add_argument("--semente", type=int, default=0)
+
+    puro = subcomandos.add_parser("puro", help="compara o Floyd-Warshall em Python puro com a versão anterior")
+    puro.add_argument("instancias", nargs="*", help="arquivos .dat medidos além das instâncias sintéticas")
+    puro.add_argument("--tamanhos", default="100,200,300",
+                      help="números de nós das instâncias sintéticas, separados por vírgula")
+    puro.add_argument("--razao-arestas", type=float, default=1.0, help="arestas por nó")
+    puro.add_argument("--razao-arcos", type=float, default=1.5, help="arcos por nó")
+    puro.add_argument("--repeticoes", type=int, default=3)
+    puro.add_argument("--semente", type=int, default=0)
+    args = parser.parse_args()
+
+    if args.comando == "etapas":
+        tamanhos = [int(tamanho) for tamanho in args.tamanhos.split(",") if tamanho.strip()]
+        executar_suite(tamanhos, args.saida, args.instancias, razao_arestas=args.razao_arestas,
+                       razao_arcos=args.razao_arcos, fracao_requeridos=args.fracao_requeridos,
+                       fracao_paralelas=args.fracao_paralelas, motor=args.motor, semente=args.semente,
+                       medir_memoria=not args.sem_memoria, intermediacao=not args.sem_intermediacao)
+        print(f"Resultados gravados em: {args.saida}")
+        return
+
+    if args.comando == "puro":
+        grafos = [(caminho, analisar_arquivo_dat(caminho)) for caminho in args.instancias]
+        for num_nos in (int(tamanho) for tamanho in args.tamanhos.split(",") if tamanho.strip()):
+            grafo = gerar_multigrafo_aleatorio(num_nos, int(args.razao_arestas * num_nos), int(args.razao_arcos * num_nos),
+                                               args.semente, fracao_requeridos=0.5, fracao_paralelas=0.05)
+            grafos.append((f"sintetica_{num_nos}", grafo))
+        for medida in medir_caminho_puro(grafos, args.repeticoes):
+            print(f"{medida['instancia']:<24} {medida['num_nos']:6d} nós  referência {medida['tempo_referencia'] * 1000:10.2f} ms"
+                  f"  rápido {medida['tempo_rapido'] * 1000:10.2f} ms  aceleração {medida['aceleracao']:5.1f}x")
+        return
+
+    grafo = gerar_multigrafo_aleatorio(args.nos, args.arestas, args.arcos, args.semente)
+    resultado = medir_atualizacao_incremental(grafo, args.alteracoes, args.motor, args.semente)
+
+    print(f"Grafo: {args.nos} nós, {args.arestas} arestas, {args.arcos} arcos ({args.alteracoes} alterações)")
+    print(f"Recálculo completo:     {resultado['tempo_medio_completo'] * 1000:.2f} ms por alteração")
+    print(f"Atualização incremental: {resultado['tempo_medio_incremental'] * 1000:.2f} ms por alteração")
+    print(f"Aceleração: {resultado['aceleracao']:.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,425 @@
+"""
+Serviço local de análise de instâncias .dat, com fila de trabalhos e processos trabalhadores.
+
+    python servidor_analise.py --porta 8766 --processos 2 --limite-fila 64
+
+O protocolo é JSON por linha sobre TCP: cada linha enviada é um pedido e cada linha recebida é
+uma mensagem, identificada pelo campo "trabalho" quando se refere a uma análise. Pedidos:
+
+- {"tipo": "analisar", "caminho": "instancia.dat"}, ou com "conteudo" (texto do .dat) ou
+  "conteudo_base64" (por exemplo, um .dat compactado) no lugar de "caminho". Campos opcionais:
+  "id" (devolvido nas mensagens), "metricas" (lista de campos das estatísticas),
+  "intermediacao" ({"amostras", "tempo_limite", "estrategia", "semente"}), "motor", "contrair" e
+  "caminhos" (true para guardar as matrizes de caminhos mínimos mesmo quando as métricas pedidas
+  não as usam). Mensagens: "aceito" (com a posição na fila), "iniciado", e por fim "resultado"
+  (estatísticas, prefixo das matrizes binárias, ou null se não foram calculadas, e latências)
+  ou "erro". Com a fila cheia, "rejeitado".
+- {"tipo": "estado"}: tamanho da fila, contadores, cache em memória e latências recentes.
+
+Os resultados ficam em um CacheResultados no diretório de trabalho, indexados pelo conteúdo da
+instância e pelas opções; pedidos repetidos são respondidos da memória ou do disco, e pedidos
+iguais simultâneos compartilham a mesma análise. Cada processo trabalhador mantém os últimos
+grafos lidos, reaproveitados (com os caminhos mínimos já calculados) quando a mesma instância
+volta com outras opções.
+"""
+
+import argparse
+import asyncio
+import base64
+import hashlib
+import itertools
+import json
+import multiprocessing
+import os
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from analise_grafos import (ESTRATEGIAS_AMOSTRAGEM, METRICAS_ESTATISTICAS, MOTORES_CAMINHOS, SUFIXO_CABECALHO_BINARIO,
+                            TAMANHO_MAXIMO_CACHE, CacheResultados, MatrizCaminhosBinaria, analisar_com_cache,
+                            calcular_hash_instancia)
+
+# Número padrão de trabalhos aceitos aguardando um processo livre (além dos em execução)
+LIMITE_FILA = 64
+
+# Grafos mantidos por processo trabalhador e resultados mantidos em memória pelo servidor
+LIMITE_GRAFOS_PROCESSO = 8
+LIMITE_RESULTADOS_MEMORIA = 256
+
+# Número de trabalhos recentes considerados nas latências de "estado"
+JANELA_LATENCIAS = 1000
+
+# Tamanho máximo de uma linha do protocolo (pedidos com o conteúdo da instância)
+LIMITE_LINHA = 256 * 1024 * 1024
+
+# Opções de intermediação aceitas nos pedidos, com os valores padrão da linha de comando
+OPCOES_INTERMEDIACAO = {"amostras": None, "tempo_limite": None, "estrategia": "uniforme", "semente": 0}
+
+# Grafos já lidos neste processo trabalhador, pelo hash do conteúdo da instância (LRU)
+_grafos_processo = OrderedDict()
+
+def _executar_trabalho(caminho_arquivo, hash_instancia, diretorio_cache, tamanho_maximo_cache, opcoes):
+    """
+    Executado nos processos trabalhadores: analisa a instância com analisar_com_cache,
+    reaproveitando o grafo se este processo já a leu. Retorna as estatísticas, o prefixo das
+    matrizes no cache, a origem do resultado ("disco" ou "calculado") e o tempo de análise.
+    """
+    inicio = time.perf_counter()
+    cache = CacheResultados(diretorio_cache, tamanho_maximo_cache)
+    grafo = _grafos_processo.get(hash_instancia)
+    estatisticas, resultado = analisar_com_cache(caminho_arquivo, cache, opcoes["intermediacao"], opcoes["motor"],
+                                                 metricas=opcoes["metricas"], contrair=opcoes["contrair"],
+                                                 grafo=grafo, hash_instancia=hash_instancia,
+                                                 formato_caminhos="binario" if opcoes["caminhos"] else "nenhum")
+    if resultado is None or isinstance(resultado, MatrizCaminhosBinaria):
+        if resultado is not None:
+            resultado.fechar()
+        origem = "disco"
+    else:
+        origem = "calculado"
+        _grafos_processo[hash_instancia] = resultado
+        _grafos_processo.move_to_end(hash_instancia)
+        while len(_grafos_processo) > LIMITE_GRAFOS_PROCESSO:
+            _grafos_processo.popitem(last=False)
+
+    chave = cache.chave_analise(caminho_arquivo, opcoes["intermediacao"], opcoes["metricas"], hash_instancia)
+    return {
+        "estatisticas": dict(estatisticas),
+        "caminhos": cache.prefixo_caminhos(chave) if cache.tem_caminhos(chave) else None,
+        "origem": origem,
+        "grafo_reaproveitado": grafo is not None and origem == "calculado",
+        "analise_segundos": time.perf_counter() - inicio,
+    }
+
+def opcoes_trabalho(pedido):
+    """
+    Valida as opções de análise de um pedido e as completa com os padrões. Retorna
+    {"metricas", "intermediacao", "motor", "contrair", "caminhos"}; ValueError se alguma for inválida.
+    """
+    metricas = pedido.get("metricas")
+    if isinstance(metricas, str):
+        metricas = [nome.strip() for nome in metricas.split(",") if nome.strip()]
+    if metricas is not None:
+        desconhecidas = [nome for nome in metricas if nome not in METRICAS_ESTATISTICAS]
+        if desconhecidas:
+            raise ValueError(f"métricas desconhecidas: {', '.join(map(str, desconhecidas))}")
+
+    intermediacao = dict(OPCOES_INTERMEDIACAO)
+    extras = pedido.get("intermediacao") or {}
+    desconhecidas = [nome for nome in extras if nome not in OPCOES_INTERMEDIACAO]
+    if desconhecidas:
+        raise ValueError(f"opções de intermediação desconhecidas: {', '.join(desconhecidas)}")
+    intermediacao.update(extras)
+    if intermediacao["estrategia"] not in ESTRATEGIAS_AMOSTRAGEM:
+        raise ValueError(f"estratégia de amostragem desconhecida: {intermediacao['estrategia']!r}")
+
+    motor = pedido.get("motor", "auto")
+    if motor not in MOTORES_CAMINHOS:
+        raise ValueError(f"motor desconhecido: {motor!r}")
+    return {"metricas": metricas, "intermediacao": intermediacao, "motor": motor,
+            "contrair": bool(pedido.get("contrair", False)), "caminhos": bool(pedido.get("caminhos", False))}
+
+def _gravar_entrada(caminho, dados):
+    """Grava uma instância recebida de uma vez (arquivo temporário + rename)."""
+    temporario = f"{caminho}.tmp-{os.getpid()}"
+    with open(temporario, 'wb') as arquivo:
+        arquivo.write(dados)
+    os.replace(temporario, caminho)
+
+def _resumo_latencias(valores):
+    """Mediana, percentil 95 e máximo de uma lista de durações (None se estiver vazia)."""
+    if not valores:
+        return None
+    ordenados = sorted(valores)
+
+    def percentil(fracao):
+        return ordenados[min(len(ordenados) - 1, int(fracao * len(ordenados)))]
+
+    return {"amostras": len(ordenados), "p50": percentil(0.5), "p95": percentil(0.95), "maximo": ordenados[-1]}
+
+class ServidorAnalise:
+    """
+    Fila de trabalhos de análise atendida por um pool de processos.
+
+    A fila (asyncio.Queue) tem tamanho limitado: pedidos que não cabem nela são rejeitados na
+    hora, em vez de acumular trabalho sem limite. Há uma tarefa consumidora por processo, de
+    modo que cada trabalho retirado da fila começa imediatamente em um processo livre.
+    """
+    def __init__(self, diretorio, processos=1, limite_fila=LIMITE_FILA, tamanho_maximo_cache=TAMANHO_MAXIMO_CACHE):
+        self.diretorio_cache = os.path.join(diretorio, "cache")
+        self.diretorio_entradas = os.path.join(diretorio, "entradas")
+        os.makedirs(self.diretorio_cache, exist_ok=True)
+        os.makedirs(self.diretorio_entradas, exist_ok=True)
+        self.processos = max(1, processos)
+        self.limite_fila = limite_fila
+        self.tamanho_maximo_cache = tamanho_maximo_cache
+
+        self.fila = None
+        self._executor = None
+        self._consumidores = []
+        self._ids = itertools.count(1)
+        self._resultados = OrderedDict()  # {chave: resultado} dos trabalhos concluídos (LRU)
+        self._em_andamento = {}  # {chave: asyncio.Future} dos trabalhos na fila ou em execução
+        self.em_execucao = 0
+        self.contadores = {"recebidos": 0, "concluidos": 0, "erros": 0, "rejeitados": 0,
+                           "acertos_memoria": 0, "compartilhados": 0}
+        self.latencias = deque(maxlen=JANELA_LATENCIAS)
+
+    async def iniciar(self):
+        """Cria a fila, o pool de processos e as tarefas consumidoras."""
+        self.fila = asyncio.Queue(maxsize=self.limite_fila)
+        self._executor = self._criar_executor()
+        self._consumidores = [asyncio.create_task(self._consumir()) for _ in range(self.processos)]
+
+    def _criar_executor(self):
+        # Processos criados com fork herdariam os sockets das conexões abertas (que então não se
+        # fechariam para o cliente) e as threads do laço de eventos; spawn parte de um processo limpo
+        return ProcessPoolExecutor(max_workers=self.processos, mp_context=multiprocessing.get_context("spawn"))
+
+    async def parar(self):
+        """Interrompe as tarefas consumidoras e encerra o pool de processos."""
+        for consumidor in self._consumidores:
+            consumidor.cancel()
+        await asyncio.gather(*self._consumidores, return_exceptions=True)
+        self._executor.shutdown(cancel_futures=True)
+
+    async def atender(self, leitor, escritor):
+        """Atende a uma conexão: cada linha é um pedido; análises correm em paralelo."""
+        async def enviar(mensagem):
+            try:
+                escritor.write(json.dumps(mensagem).encode() + b"\n")
+                await escritor.drain()
+            except ConnectionError:
+                # O cliente desconectou; o trabalho continua e o resultado fica no cache
+                pass
+
+        tarefas = set()
+        try:
+            while True:
+                try:
+                    linha = await leitor.readline()
+                except (ValueError, ConnectionError):
+                    break
+                if not linha:
+                    break
+                if not linha.strip():
+                    continue
+                try:
+                    pedido = json.loads(linha)
+                    tipo = pedido.get("tipo")
+                except (ValueError, AttributeError):
+                    await enviar({"tipo": "erro", "erro": "cada linha deve ser um objeto JSON"})
+                    continue
+
+                if tipo == "analisar":
+                    tarefa = asyncio.create_task(self.analisar(pedido, enviar))
+                    tarefas.add(tarefa)
+                    tarefa.add_done_callback(tarefas.discard)
+                elif tipo == "estado":
+                    await enviar({"tipo": "estado", **self.estado()})
+                else:
+                    await enviar({"tipo": "erro", "erro": f"tipo de pedido desconhecido: {tipo!r}"})
+
+            # Fim da entrada: conclui as análises pendentes desta conexão antes de fechá-la
+            if tarefas:
+                await asyncio.gather(*tarefas, return_exceptions=True)
+        finally:
+            escritor.close()
+
+    async def analisar(self, pedido, enviar):
+        """Processa um pedido de análise, enviando as mensagens de progresso e o resultado."""
+        recebido = time.perf_counter()
+        self.contadores["recebidos"] += 1
+        cabecalho = {"trabalho": next(self._ids)}
+        if "id" in pedido:
+            cabecalho["id"] = pedido["id"]
+
+        try:
+            opcoes = opcoes_trabalho(pedido)
+            caminho_arquivo, hash_instancia = await self._preparar_entrada(pedido)
+        except (ValueError, TypeError, OSError) as erro:
+            self.contadores["erros"] += 1
+            await enviar({"tipo": "erro", **cabecalho, "erro": str(erro)})
+            return
+        chave = (hash_instancia, json.dumps({"metricas": sorted(opcoes["metricas"]) if opcoes["metricas"] else None,
+                                             "intermediacao": opcoes["intermediacao"],
+                                             "caminhos": opcoes["caminhos"]}, sort_keys=True))
+
+        resultado = self._resultados.get(chave)
+        if resultado is not None and (resultado["caminhos"] is None
+                                      or os.path.exists(resultado["caminhos"] + SUFIXO_CABECALHO_BINARIO)):
+            self._resultados.move_to_end(chave)
+            self.contadores["acertos_memoria"] += 1
+            await self._enviar_resultado(enviar, cabecalho, resultado, "memoria", {}, recebido)
+            return
+
+        futuro = self._em_andamento.get(chave)
+        if futuro is not None:
+            # Mesma instância e opções já na fila ou em execução: aguarda o mesmo resultado
+            self.contadores["compartilhados"] += 1
+            await enviar({"tipo": "aceito", **cabecalho, "compartilhado": True})
+            origem = "compartilhado"
+        else:
+            futuro = asyncio.get_running_loop().create_future()
+            trabalho = (cabecalho, caminho_arquivo, hash_instancia, opcoes, futuro, recebido, enviar)
+            try:
+                self.fila.put_nowait(trabalho)
+            except asyncio.QueueFull:
+                self.contadores["rejeitados"] += 1
+                await enviar({"tipo": "rejeitado", **cabecalho,
+                              "erro": f"fila cheia ({self.limite_fila} trabalhos aguardando)"})
+                return
+            self._em_andamento[chave] = futuro
+            futuro.add_done_callback(lambda _: self._em_andamento.pop(chave, None))
+            await enviar({"tipo": "aceito", **cabecalho, "posicao": self.fila.qsize()})
+            origem = None
+
+        try:
+            resultado, latencias = await asyncio.shield(futuro)
+        except Exception as erro:
+            self.contadores["erros"] += 1
+            await enviar({"tipo": "erro", **cabecalho, "erro": f"{type(erro).__name__}: {erro}"})
+            return
+
+        self._resultados[chave] = resultado
+        self._resultados.move_to_end(chave)
+        while len(self._resultados) > LIMITE_RESULTADOS_MEMORIA:
+            self._resultados.popitem(last=False)
+        await self._enviar_resultado(enviar, cabecalho, resultado, origem or resultado["origem"],
+                                     latencias if origem is None else {}, recebido)
+
+    async def _enviar_resultado(self, enviar, cabecalho, resultado, origem, latencias, recebido):
+        """Registra as latências do trabalho e envia a mensagem de resultado."""
+        latencias = {**latencias, "total_segundos": time.perf_counter() - recebido}
+        self.latencias.append(latencias)
+        self.contadores["concluidos"] += 1
+        await enviar({
+            "tipo": "resultado", **cabecalho,
+            "origem": origem,
+            "estatisticas": resultado["estatisticas"],
+            "caminhos": resultado["caminhos"],
+            "latencia": latencias,
+        })
+
+    async def _preparar_entrada(self, pedido):
+        """
+        Retorna (caminho do arquivo, hash do conteúdo) da instância do pedido. Conteúdos
+        enviados são gravados em diretorio_entradas com o hash como nome, uma única vez.
+        """
+        for campo in ("caminho", "conteudo", "conteudo_base64"):
+            if campo in pedido and not isinstance(pedido[campo], str):
+                raise ValueError(f'"{campo}" deve ser um texto')
+
+        if "caminho" in pedido:
+            caminho_arquivo = os.path.abspath(pedido["caminho"])
+            if not os.path.isfile(caminho_arquivo):
+                raise ValueError(f"arquivo não encontrado: {pedido['caminho']}")
+            return caminho_arquivo, await asyncio.to_thread(calcular_hash_instancia, caminho_arquivo)
+
+        if "conteudo" in pedido:
+            dados = pedido["conteudo"].encode()
+        elif "conteudo_base64" in pedido:
+            dados = base64.b64decode(pedido["conteudo_base64"], validate=True)
+        else:
+            raise ValueError('informe "caminho", "conteudo" ou "conteudo_base64"')
+
+        # Mesmo hash de calcular_hash_instancia: envios e caminhos do mesmo conteúdo se encontram no cache
+        hash_instancia = hashlib.sha256(dados).hexdigest()
+        caminho_arquivo = os.path.abspath(os.path.join(self.diretorio_entradas, hash_instancia + ".dat"))
+        if not os.path.exists(caminho_arquivo):
+            await asyncio.to_thread(_gravar_entrada, caminho_arquivo, dados)
+        return caminho_arquivo, hash_instancia
+
+    async def _consumir(self):
+        """Retira trabalhos da fila e os executa no pool de processos, um de cada vez."""
+        laco = asyncio.get_running_loop()
+        while True:
+            cabecalho, caminho_arquivo, hash_instancia, opcoes, futuro, recebido, enviar = await self.fila.get()
+            inicio = time.perf_counter()
+            self.em_execucao += 1
+            executor = self._executor
+            try:
+                await enviar({"tipo": "iniciado", **cabecalho})
+                resultado = await laco.run_in_executor(executor, _executar_trabalho, caminho_arquivo,
+                                                       hash_instancia, self.diretorio_cache,
+                                                       self.tamanho_maximo_cache, opcoes)
+                fim = time.perf_counter()
+                latencias = {
+                    "espera_fila_segundos": inicio - recebido,
+                    "execucao_segundos": fim - inicio,
+                    "analise_segundos": resultado.pop("analise_segundos"),
+                    "grafo_reaproveitado": resultado.pop("grafo_reaproveitado"),
+                }
+                futuro.set_result((resultado, latencias))
+            except asyncio.CancelledError:
+                futuro.cancel()
+                raise
+            except BrokenProcessPool as erro:
+                # Um processo trabalhador morreu e o pool não aceita mais trabalhos: este trabalho
+                # falha, e o pool é recriado (uma vez, pelo primeiro consumidor a perceber)
+                if self._executor is executor:
+                    self._executor = self._criar_executor()
+                    executor.shutdown(wait=False, cancel_futures=True)
+                futuro.set_exception(erro)
+            except Exception as erro:
+                futuro.set_exception(erro)
+            finally:
+                self.em_execucao -= 1
+                self.fila.task_done()
+
+    def estado(self):
+        """Tamanho da fila, contadores, uso do cache em memória e latências dos trabalhos recentes."""
+        latencias = {}
+        for campo in ("espera_fila_segundos", "execucao_segundos", "total_segundos"):
+            latencias[campo] = _resumo_latencias([medida[campo] for medida in self.latencias if campo in medida])
+        return {
+            "fila": self.fila.qsize() if self.fila is not None else 0,
+            "limite_fila": self.limite_fila,
+            "processos": self.processos,
+            "em_execucao": self.em_execucao,
+            "resultados_em_memoria": len(self._resultados),
+            **self.contadores,
+            "latencia": latencias,
+        }
+
+async def executar_servidor(servidor, host="127.0.0.1", porta=8766, pronto=None):
+    """Inicia o servidor e atende às conexões até ser cancelado; pronto(porta) é chamado ao iniciar."""
+    await servidor.iniciar()
+    tcp = await asyncio.start_server(servidor.atender, host, porta, limit=LIMITE_LINHA)
+    try:
+        if pronto is not None:
+            pronto(tcp.sockets[0].getsockname()[1])
+        async with tcp:
+            await tcp.serve_forever()
+    finally:
+        await servidor.parar()
+
+def main():
+    """Atende aos pedidos de análise até ser interrompido."""
+    parser = argparse.ArgumentParser(description="Serviço local de análise de instâncias .dat com fila de trabalhos.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--porta", type=int, default=8766)
+    parser.add_argument("-p", "--processos", type=int, default=1, help="número de processos trabalhadores")
+    parser.add_argument("--limite-fila", type=int, default=LIMITE_FILA,
+                        help="número máximo de trabalhos aguardando; além dele, os pedidos são rejeitados")
+    parser.add_argument("--diretorio", default="servidor_analise",
+                        help="diretório de trabalho (cache de resultados e instâncias recebidas)")
+    parser.add_argument("--cache-tamanho-maximo", type=int, default=TAMANHO_MAXIMO_CACHE // (1024 * 1024),
+                        help="tamanho máximo do cache de resultados, em MB")
+    args = parser.parse_args()
+
+    servidor = ServidorAnalise(args.diretorio, args.processos, args.limite_fila,
+                               args.cache_tamanho_maximo * 1024 * 1024)
+
+    def pronto(porta):
+        print(f"Atendendo em {args.host}:{porta} com {servidor.processos} processo(s); "
+              f"resultados em {servidor.diretorio_cache}")
+
+    try:
+        asyncio.run(executar_servidor(servidor, args.host, args.porta, pronto))
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,219 @@
+"""
+Serviço de consulta de caminhos mínimos a partir das matrizes pré-calculadas por analise_grafos.py.
+
+    python servidor_caminhos.py caminhos_minimos --porta 8765
+
+As matrizes são carregadas uma única vez (as binárias por mmap, sem leitura completa) e cada
+consulta custa O(tamanho do caminho). Rotas, com respostas em JSON:
+
+- GET  /distancia?origem=U&destino=V
+- GET  /caminho?origem=U&destino=V
+- POST /lote com {"pares": [[U, V], ...]}: um resultado de /caminho por par
+- GET  /estado: número de nós e uso do cache de rotas
+"""
+
+import argparse
+import functools
+import json
+import os
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from analise_grafos import (MatrizCaminhosBinaria, MatrizCaminhosMemoria, SUFIXO_CABECALHO_BINARIO,
+                            carregar_caminhos_minimos_json, carregar_caminhos_minimos_ndjson)
+
+# Número padrão de rotas (pares origem-destino) mantidas no cache LRU
+TAMANHO_CACHE_ROTAS = 10000
+
+def abrir_matriz_caminhos(origem):
+    """
+    Abre as matrizes de caminhos mínimos de origem: um prefixo de exportar_caminhos_minimos_binario
+    (lido por mmap), um arquivo JSON ou NDJSON (.ndjson) dos exportadores de caminhos mínimos,
+    compactado ou não, ou um grafo já calculado.
+    """
+    if hasattr(origem, "calcular_caminhos_minimos"):
+        return MatrizCaminhosMemoria(*origem.calcular_caminhos_minimos())
+    if os.path.exists(origem + SUFIXO_CABECALHO_BINARIO):
+        return MatrizCaminhosBinaria(origem)
+    if origem.endswith(SUFIXO_CABECALHO_BINARIO):
+        return MatrizCaminhosBinaria(origem[:-len(SUFIXO_CABECALHO_BINARIO)])
+    if origem.endswith((".ndjson", ".ndjson.gz")):
+        return carregar_caminhos_minimos_ndjson(origem)
+    return carregar_caminhos_minimos_json(origem)
+
+class ConsultaCaminhos:
+    """
+    Consultas de distância e de rota sobre matrizes de caminhos mínimos já calculadas.
+
+    As rotas reconstruídas ficam em um cache LRU de tamanho_cache pares origem-destino, de
+    modo que pares consultados com frequência não refazem o percurso pelos predecessores.
+    Os métodos podem ser chamados de várias threads ao mesmo tempo.
+    """
+    def __init__(self, origem, tamanho_cache=TAMANHO_CACHE_ROTAS):
+        self.matriz = abrir_matriz_caminhos(origem)
+        # Identificadores recebidos como texto (por exemplo, em URLs) são convertidos pelo nome
+        self._nos_por_texto = {str(no): no for no in self.matriz.lista_nos}
+        self._rota = functools.lru_cache(maxsize=tamanho_cache)(self._reconstruir_rota)
+
+    def fechar(self):
+        """Libera as matrizes abertas."""
+        self._rota.cache_clear()
+        self.matriz.fechar()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.fechar()
+
+    def no(self, identificador):
+        """Converte um identificador (o próprio nó ou seu texto) no nó; KeyError se não existir."""
+        if identificador in self.matriz.no_para_indice:
+            return identificador
+        return self._nos_por_texto[str(identificador)]
+
+    def distancia(self, origem, destino):
+        """Distância mínima de origem a destino (inf quando não há caminho)."""
+        return self.matriz.distancia(self.no(origem), self.no(destino))
+
+    def caminho(self, origem, destino):
+        """
+        Retorna {"origem", "destino", "distancia", "caminho"} para o par, com o caminho como
+        lista de nós ([] quando não há caminho).
+        """
+        origem, destino = self.no(origem), self.no(destino)
+        distancia, caminho = self._rota(origem, destino)
+        return {"origem": origem, "destino": destino, "distancia": distancia, "caminho": list(caminho)}
+
+    def _reconstruir_rota(self, origem, destino):
+        return self.matriz.distancia(origem, destino), tuple(self.matriz.caminho(origem, destino))
+
+    def consultar_lote(self, pares):
+        """
+        Responde a uma sequência de pares (origem, destino) com um resultado de caminho por par;
+        pares com nós inexistentes recebem {"origem", "destino", "erro"}.
+        """
+        resultados = []
+        for origem, destino in pares:
+            try:
+                resultados.append(self.caminho(origem, destino))
+            except KeyError as erro:
+                resultados.append({"origem": origem, "destino": destino, "erro": f"nó inexistente: {erro.args[0]}"})
+        return resultados
+
+    def estado(self):
+        """Número de nós e estatísticas de uso do cache de rotas."""
+        info = self._rota.cache_info()
+        return {
+            "num_nos": self.matriz.n,
+            "cache": {"acertos": info.hits, "faltas": info.misses, "tamanho": info.currsize, "tamanho_maximo": info.maxsize},
+        }
+
+def _valor_json(valor):
+    """
+    Distâncias infinitas viram "inf" e distâncias inteiras lidas como float voltam a ser int,
+    como nos arquivos exportados por analise_grafos.
+    """
+    if valor == float('inf'):
+        return "inf"
+    if isinstance(valor, float) and valor.is_integer():
+        return int(valor)
+    return valor
+
+def _resultado_json(resultado):
+    if "distancia" in resultado:
+        return {**resultado, "distancia": _valor_json(resultado["distancia"])}
+    return resultado
+
+class ManipuladorConsultas(BaseHTTPRequestHandler):
+    """Atende às rotas HTTP do serviço; a ConsultaCaminhos fica no atributo consulta do servidor."""
+    protocol_version = "HTTP/1.1"
+    # Cabeçalhos e corpo saem em escritas separadas; sem isto, o Nagle atrasa cada resposta
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        consulta = self.server.consulta
+        if url.path == "/estado":
+            self._responder(200, consulta.estado())
+            return
+        if url.path not in ("/distancia", "/caminho"):
+            self._responder(404, {"erro": f"rota desconhecida: {url.path}"})
+            return
+
+        parametros = parse_qs(url.query)
+        if "origem" not in parametros or "destino" not in parametros:
+            self._responder(400, {"erro": "informe os parâmetros origem e destino"})
+            return
+        origem, destino = parametros["origem"][0], parametros["destino"][0]
+        try:
+            if url.path == "/distancia":
+                origem, destino = consulta.no(origem), consulta.no(destino)
+                resposta = {"origem": origem, "destino": destino,
+                            "distancia": consulta.distancia(origem, destino)}
+            else:
+                resposta = consulta.caminho(origem, destino)
+        except KeyError as erro:
+            self._responder(404, {"erro": f"nó inexistente: {erro.args[0]}"})
+            return
+        self._responder(200, _resultado_json(resposta))
+
+    def do_POST(self):
+        if urlparse(self.path).path != "/lote":
+            self._responder(404, {"erro": f"rota desconhecida: {self.path}"})
+            return
+        try:
+            tamanho = int(self.headers.get("Content-Length", 0))
+            pares = json.loads(self.rfile.read(tamanho))["pares"]
+            pares = [(origem, destino) for origem, destino in pares]
+            # bool é subclasse de int, mas true/false não são identificadores de nó
+            if not all(isinstance(no, (str, int, float)) and not isinstance(no, bool) for par in pares for no in par):
+                raise TypeError("nós devem ser números ou textos")
+        except (ValueError, KeyError, TypeError):
+            self._responder(400, {"erro": 'corpo esperado: {"pares": [[origem, destino], ...]}'})
+            return
+        resultados = self.server.consulta.consultar_lote(pares)
+        self._responder(200, {"resultados": [_resultado_json(resultado) for resultado in resultados]})
+
+    def _responder(self, status, conteudo):
+        corpo = json.dumps(conteudo).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(corpo)))
+        self.end_headers()
+        self.wfile.write(corpo)
+
+    def log_message(self, formato, *argumentos):
+        # Consultas frequentes: o registro por requisição fica desligado
+        pass
+
+def criar_servidor(consulta, host="127.0.0.1", porta=8765):
+    """Cria (sem iniciar) o servidor HTTP com uma thread por conexão para a consulta dada."""
+    servidor = ThreadingHTTPServer((host, porta), ManipuladorConsultas)
+    servidor.daemon_threads = True
+    servidor.consulta = consulta
+    return servidor
+
+def main():
+    """Carrega as matrizes e atende às consultas até ser interrompido."""
+    parser = argparse.ArgumentParser(description="Serviço HTTP de consulta de caminhos mínimos pré-calculados.")
+    parser.add_argument("caminhos", nargs="?", default="caminhos_minimos",
+                        help="prefixo das matrizes binárias ou arquivo JSON de caminhos mínimos")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--porta", type=int, default=8765)
+    parser.add_argument("--cache", type=int, default=TAMANHO_CACHE_ROTAS,
+                        help="número de rotas (pares origem-destino) mantidas em cache")
+    args = parser.parse_args()
+
+    with ConsultaCaminhos(args.caminhos, args.cache) as consulta:
+        servidor = criar_servidor(consulta, args.host, args.porta)
+        print(f"Consultando {consulta.matriz.n} nós em http://{args.host}:{servidor.server_port}/")
+        try:
+            servidor.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            servidor.server_close()
+
+if __name__ == "__main__":
+    main()
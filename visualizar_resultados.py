@@ -1,20 +1,124 @@
 """
 Script para visualizar os resultados da análise de grafos sem precisar do Jupyter Notebook.
+
+Apenas o que é exibido é lido dos arquivos de caminhos mínimos: as matrizes binárias são
+consultadas por mmap e os arquivos JSON/NDJSON são lidos em fluxo até o bloco de nós pedido.
 """
 
+import argparse
+import heapq
 import json
 import os
 
+from analise_grafos import (MatrizCaminhosBinaria, SUFIXO_CABECALHO_BINARIO, abrir_instancia_dat,
+                            iterar_caminhos_minimos_json, iterar_caminhos_minimos_ndjson)
+
+# Arquivos de caminhos mínimos procurados por padrão, em ordem de preferência
+ARQUIVOS_CAMINHOS = ("caminhos_minimos", "caminhos_minimos.ndjson", "caminhos_minimos.ndjson.gz",
+                     "caminhos_minimos.json", "caminhos_minimos.json.gz")
+
 def imprimir_cabecalho(texto):
     """Imprime um cabeçalho formatado."""
     print("\n" + "=" * 50)
     print(texto)
     print("=" * 50 + "\n")
 
+def formatar_distancia(valor):
+    """Formata uma distância, exibindo valores inteiros sem casas decimais."""
+    if isinstance(valor, float) and valor.is_integer():
+        return str(int(valor))
+    return str(valor)
+
+def formatar_valor(valor, formato=""):
+    """Formata um campo das estatísticas, exibindo 'N/A' quando ele não foi calculado."""
+    if valor is None:
+        return "N/A"
+    return format(valor, formato)
+
+def imprimir_amostra_distancias(nos, distancia):
+    """Imprime a submatriz de distâncias entre os nós dados, usando distancia(origem, destino)."""
+    imprimir_cabecalho("AMOSTRA DA MATRIZ DE DISTÂNCIAS")
+    
+    # Imprimir cabeçalho
+    print(f"{'De/Para':<8}", end="")
+    for no in nos:
+        print(f"{no:<8}", end="")
+    print()
+    
+    # Imprimir linhas
+    for origem in nos:
+        print(f"{origem:<8}", end="")
+        for destino in nos:
+            print(f"{formatar_distancia(distancia(origem, destino)):<8}", end="")
+        print()
+
+def encontrar_arquivo_caminhos(caminhos=None):
+    """
+    Retorna o arquivo (ou prefixo, para as matrizes binárias) de caminhos mínimos a exibir: o
+    indicado ou o primeiro de ARQUIVOS_CAMINHOS existente. Retorna None se não houver nenhum.
+    """
+    for candidato in [caminhos] if caminhos else ARQUIVOS_CAMINHOS:
+        if os.path.exists(candidato + SUFIXO_CABECALHO_BINARIO):
+            return candidato
+        if candidato.endswith(SUFIXO_CABECALHO_BINARIO):
+            return candidato[:-len(SUFIXO_CABECALHO_BINARIO)]
+        if os.path.isfile(candidato):
+            return candidato
+    return None
+
+def selecionar_bloco(lista_nos, inicio=0, tamanho=5, nos=None):
+    """
+    Nós do bloco exibido: os nós indicados (comparados pelo texto) ou tamanho nós consecutivos
+    a partir da posição inicio da ordem das matrizes.
+    """
+    if nos:
+        por_texto = {str(no): no for no in lista_nos}
+        return [por_texto[str(no)] for no in nos if str(no) in por_texto]
+    return lista_nos[inicio:inicio + tamanho]
+
+def ler_bloco_distancias(arquivo_caminhos, inicio=0, tamanho=5, nos=None):
+    """
+    Lê do arquivo de caminhos mínimos apenas a submatriz de distâncias entre os nós do bloco.
+    Retorna (nos_do_bloco, distancia), com distancia(origem, destino).
+    """
+    if os.path.exists(arquivo_caminhos + SUFIXO_CABECALHO_BINARIO):
+        matriz = MatrizCaminhosBinaria(arquivo_caminhos)
+        bloco = selecionar_bloco(matriz.lista_nos, inicio, tamanho, nos)
+        # Copia a submatriz para poder liberar o mapeamento
+        linhas = {origem: {destino: matriz.distancia(origem, destino) for destino in bloco} for origem in bloco}
+        matriz.fechar()
+        return bloco, lambda origem, destino: linhas[origem][destino]
+
+    if ".ndjson" in os.path.basename(arquivo_caminhos):
+        # O cabeçalho (primeira linha) traz a ordem dos nós
+        with abrir_instancia_dat(arquivo_caminhos) as arquivo:
+            lista_nos = json.loads(arquivo.readline())["nos"]
+        bloco = selecionar_bloco(lista_nos, inicio, tamanho, nos)
+        colunas = {no: i for i, no in enumerate(lista_nos)}
+        linhas = {origem: {destino: linha_dist[colunas[destino]] for destino in bloco}
+                  for origem, linha_dist, _, _ in iterar_caminhos_minimos_ndjson(arquivo_caminhos, bloco)}
+        return bloco, lambda origem, destino: linhas.get(origem, {}).get(destino, "inf")
+
+    # JSON: a ordem dos nós vem das chaves da primeira linha; só as linhas do bloco são decodificadas
+    _, primeira_linha = next(iterar_caminhos_minimos_json(arquivo_caminhos), (None, {}))
+    bloco = selecionar_bloco(list(primeira_linha), inicio, tamanho, nos)
+    linhas = dict(iterar_caminhos_minimos_json(arquivo_caminhos, origens=bloco)) if bloco else {}
+    return bloco, lambda origem, destino: linhas.get(origem, {}).get(destino, "inf")
+
 def main():
+    parser = argparse.ArgumentParser(description="Exibe os resultados gravados por analise_grafos.py.")
+    parser.add_argument("--estatisticas", default="estatisticas_grafo.json", help="arquivo de estatísticas")
+    parser.add_argument("--caminhos", help="prefixo das matrizes binárias ou arquivo JSON/NDJSON de caminhos "
+                                           "mínimos (padrão: o primeiro encontrado entre os nomes gerados)")
+    parser.add_argument("--inicio", type=int, default=0,
+                        help="posição (na ordem das matrizes) do primeiro nó do bloco exibido")
+    parser.add_argument("--tamanho", type=int, default=5, help="número de nós do bloco exibido")
+    parser.add_argument("--nos", help="nós do bloco exibido, separados por vírgula (substitui --inicio/--tamanho)")
+    parser.add_argument("--top", type=int, default=10, help="número de nós exibidos na lista de intermediação")
+    args = parser.parse_args()
+
     # Verificar se os arquivos de resultados existem
-    arquivo_estatisticas = "estatisticas_grafo.json"
-    arquivo_caminhos = "caminhos_minimos.json"
+    arquivo_estatisticas = args.estatisticas
     
     if not os.path.exists(arquivo_estatisticas):
         print(f"Erro: Arquivo '{arquivo_estatisticas}' não encontrado.")
@@ -41,48 +145,46 @@ def main():
     print(f"Número de nós requeridos: {estatisticas.get('num_nos_requeridos', 'N/A')}")
     print(f"Número de arestas requeridas: {estatisticas.get('num_arestas_requeridas', 'N/A')}")
     print(f"Número de arcos requeridos: {estatisticas.get('num_arcos_requeridos', 'N/A')}")
-    print(f"Densidade do grafo: {estatisticas.get('densidade', 'N/A'):.4f}")
+    print(f"Densidade do grafo: {formatar_valor(estatisticas.get('densidade'), '.4f')}")
     print(f"Número de componentes conectados: {estatisticas.get('componentes_conectados', 'N/A')}")
+    print(f"Número de componentes fortemente conectados: {estatisticas.get('componentes_fortemente_conectados', 'N/A')}")
     print(f"Grau mínimo: {estatisticas.get('grau_minimo', 'N/A')}")
     print(f"Grau máximo: {estatisticas.get('grau_maximo', 'N/A')}")
-    print(f"Comprimento médio do caminho: {estatisticas.get('comprimento_medio_caminho', 'N/A'):.4f}")
+    print(f"Comprimento médio do caminho: {formatar_valor(estatisticas.get('comprimento_medio_caminho'), '.4f')}")
     print(f"Diâmetro do grafo: {estatisticas.get('diametro', 'N/A')}")
+    print(f"Raio do grafo: {estatisticas.get('raio', 'N/A')}")
+    print(f"Excentricidade do depósito: {formatar_valor(estatisticas.get('excentricidade_deposito'))}")
     
     # Exibir informações sobre centralidade de intermediação
-    imprimir_cabecalho("CENTRALIDADE DE INTERMEDIAÇÃO (TOP 10)")
+    imprimir_cabecalho(f"CENTRALIDADE DE INTERMEDIAÇÃO (TOP {args.top})")
     intermediacao = estatisticas.get('centralidade_intermediacao', {})
     if isinstance(intermediacao, dict):
-        # Converter para lista de tuplas e ordenar
-        lista_intermediacao = [(no, valor) for no, valor in intermediacao.items()]
-        lista_intermediacao.sort(key=lambda x: x[1], reverse=True)
-        
-        # Exibir top 10
-        for i, (no, valor) in enumerate(lista_intermediacao[:10], 1):
-            print(f"{i}. Nó {no}: {valor}")
+        # Seleciona os maiores valores sem ordenar o dicionário inteiro
+        maiores = heapq.nlargest(args.top, intermediacao.items(), key=lambda item: item[1])
+        for i, (no, valor) in enumerate(maiores, 1):
+            print(f"{i}. Nó {no}: {valor:.2f}")
     
-    # Verificar se o arquivo de caminhos mínimos existe
-    if os.path.exists(arquivo_caminhos):
-        with open(arquivo_caminhos, 'r') as f:
-            caminhos = json.load(f)
-        
-        # Exibir amostra da matriz de distâncias
-        imprimir_cabecalho("AMOSTRA DA MATRIZ DE DISTÂNCIAS")
-        distancias = caminhos.get('distancias', {})
-        nos = list(distancias.keys())[:5]  # Primeiros 5 nós
-        
-        # Imprimir cabeçalho
-        print(f"{'De/Para':<8}", end="")
-        for no in nos:
-            print(f"{no:<8}", end="")
-        print()
-        
-        # Imprimir linhas
-        for origem in nos:
-            print(f"{origem:<8}", end="")
-            for destino in nos:
-                valor = distancias.get(origem, {}).get(destino, "inf")
-                print(f"{valor:<8}", end="")
-            print()
+    # Informar a margem de erro quando a intermediação foi estimada por amostragem
+    aproximacao = estatisticas.get('intermediacao_aproximada')
+    if aproximacao:
+        print(f"\nValores estimados com {aproximacao['amostras']} origens sorteadas "
+              f"({aproximacao['estrategia']}): erro máximo de {aproximacao['erro_maximo']:.2f} "
+              f"com confiança de {aproximacao['confianca']:.0%}.")
+    
+    # Centralidade de proximidade, quando calculada
+    proximidade = estatisticas.get('centralidade_proximidade')
+    if isinstance(proximidade, dict):
+        imprimir_cabecalho(f"CENTRALIDADE DE PROXIMIDADE (TOP {args.top})")
+        maiores = heapq.nlargest(args.top, proximidade.items(), key=lambda item: item[1])
+        for i, (no, valor) in enumerate(maiores, 1):
+            print(f"{i}. Nó {no}: {valor:.4f}")
+    
+    # Preferir as matrizes binárias (lidas por mmap) aos arquivos JSON/NDJSON (lidos em fluxo)
+    arquivo_caminhos = encontrar_arquivo_caminhos(args.caminhos)
+    if arquivo_caminhos is not None:
+        nos = [no.strip() for no in args.nos.split(",") if no.strip()] if args.nos else None
+        bloco, distancia = ler_bloco_distancias(arquivo_caminhos, args.inicio, args.tamanho, nos)
+        imprimir_amostra_distancias(bloco, distancia)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file